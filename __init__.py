@@ -14,7 +14,7 @@
 import bpy
 import os
 import sys
-from . import ui, heal_cavity
+from . import ui, heal_cavity, cavity_analysis, heal_sweep, orientation_analysis
 
 # Flags to prevent redundant operations
 _initialized = False
@@ -125,9 +125,15 @@ def register():
 		print(f"[Quick Infill] Warning during setup: {e}")
 	
 	heal_cavity.register()
+	cavity_analysis.register()
+	heal_sweep.register()
+	orientation_analysis.register()
 	ui.register()
 
 
 def unregister():
 	ui.unregister()
+	orientation_analysis.unregister()
+	heal_sweep.unregister()
+	cavity_analysis.unregister()
 	heal_cavity.unregister()
@@ -1,6 +1,13 @@
 import bpy
 
 
+# Objects up to this many polygons (and without modifiers) skip the STL round
+# trip in batch_process_mesh_operation and are processed in shared batches of
+# up to SMALL_BATCH_FACES, where per-object overhead outweighs the work
+SMALL_OBJECT_MAX_FACES = 20_000
+SMALL_BATCH_FACES = 200_000
+
+
 def blender_to_meshlib(blender_obj):
     """
     Convert a Blender mesh object to a meshlib Mesh using MeshBuilder.
@@ -44,6 +51,55 @@ def blender_to_meshlib(blender_obj):
     return ml_mesh
 
 
+def blender_to_meshlib_triangles(blender_obj, scale: float = 10.0):
+    """
+    Build a meshlib mesh from the object's own mesh data (no modifiers) in
+    world space, keeping a map back to Blender polygons.
+
+    Reads everything with foreach_get, so it stays fast on million-face
+    meshes. meshlib face i is Blender loop triangle i. Like the STL route,
+    vertices at identical coordinates are welded, and a mirroring
+    matrix_world (negative determinant) flips the triangle winding so the
+    result still faces outward.
+
+    Returns:
+        tuple: (meshlib mesh, numpy array of polygon index per face)
+    """
+    import numpy as np
+    from .meshlib_utils import get_mrmeshnumpy
+    mn = get_mrmeshnumpy()
+
+    if blender_obj.type != 'MESH':
+        raise ValueError("Selected object is not a mesh.")
+
+    mesh_data = blender_obj.data
+    mesh_data.calc_loop_triangles()
+    n_verts = len(mesh_data.vertices)
+    n_tris = len(mesh_data.loop_triangles)
+
+    co = np.empty(n_verts * 3, dtype=np.float32)
+    mesh_data.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3).astype(np.float64)
+    mw = np.array(blender_obj.matrix_world, dtype=np.float64)
+    co = (co @ mw[:3, :3].T + mw[:3, 3]) * float(scale)
+
+    tris = np.empty(n_tris * 3, dtype=np.int32)
+    mesh_data.loop_triangles.foreach_get("vertices", tris)
+    tris = tris.reshape(-1, 3)
+    tri_polygons = np.empty(n_tris, dtype=np.int32)
+    mesh_data.loop_triangles.foreach_get("polygon_index", tri_polygons)
+
+    if np.linalg.det(mw[:3, :3]) < 0.0:
+        tris = tris[:, ::-1]
+
+    # Weld coincident vertices at STL (float32) precision
+    co, inverse = np.unique(co.astype(np.float32), axis=0, return_inverse=True)
+    tris = inverse.reshape(-1).astype(np.int32)[tris]
+
+    ml_mesh = mn.meshFromFacesVerts(np.ascontiguousarray(tris), co)
+    return ml_mesh, tri_polygons
+
+
 def blender_to_meshlib_via_stl(blender_obj, tmp_dir=None):
     """
     Export the given Blender object to a temporary STL and load it via meshlib.
@@ -104,6 +160,74 @@ def blender_to_meshlib_via_stl(blender_obj, tmp_dir=None):
             pass
 
 
+def blender_objects_to_meshlib(blender_objs, max_workers=4, tmp_dir=None):
+    """
+    Convert several Blender objects to meshlib meshes.
+
+    STL export must stay on the main thread, but each file is handed to a
+    worker for loading as soon as it is written, so parsing overlaps the
+    remaining exports. Returns meshes in blender_objs order.
+    """
+    import os
+    import tempfile
+    import bpy
+    from concurrent.futures import ThreadPoolExecutor
+    from .meshlib_utils import get_meshlib
+    mm, _ = get_meshlib()
+
+    tmp_dir = tmp_dir or tempfile.gettempdir()
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    def _load(stl_path):
+        try:
+            loaded = mm.loadMesh(stl_path)
+            return loaded.mesh if hasattr(loaded, 'mesh') else loaded
+        finally:
+            try:
+                os.remove(stl_path)
+            except Exception:
+                pass
+
+    view_layer = bpy.context.view_layer
+    prev_active = view_layer.objects.active
+    prev_selection = [obj for obj in bpy.context.selected_objects]
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(len(blender_objs), max_workers))) as executor:
+            futures = []
+            for blender_obj in blender_objs:
+                fd, stl_path = tempfile.mkstemp(prefix="quick_infill_", suffix=".stl", dir=tmp_dir)
+                os.close(fd)
+                for obj in bpy.context.selected_objects:
+                    obj.select_set(False)
+                blender_obj.select_set(True)
+                view_layer.objects.active = blender_obj
+
+                res = bpy.ops.wm.stl_export(
+                    'EXEC_DEFAULT',
+                    filepath=stl_path,
+                    export_selected_objects=True,
+                    use_batch=False,
+                    global_scale=10.0,
+                    apply_modifiers=True,
+                )
+                if res != {'FINISHED'}:
+                    try:
+                        os.remove(stl_path)
+                    except Exception:
+                        pass
+                    raise RuntimeError(f"Could not export '{blender_obj.name}' to STL")
+                futures.append(executor.submit(_load, stl_path))
+            return [f.result() for f in futures]
+    finally:
+        # Restore selection
+        for obj in bpy.context.selected_objects:
+            obj.select_set(False)
+        for obj in prev_selection:
+            obj.select_set(True)
+        view_layer.objects.active = prev_active
+
+
 def meshlib_to_blender_via_stl(meshlib_mesh, name: str = "Converted Mesh", import_scale: float = 0.1):
     """
     Save a meshlib mesh to a temporary STL and import it back into Blender at a given scale.
@@ -176,6 +300,31 @@ def meshlib_to_blender_via_stl(meshlib_mesh, name: str = "Converted Mesh", impor
     return obj
 
 
+def meshlib_to_blender_direct(meshlib_mesh, name: str = "Converted Mesh", import_scale: float = 0.1):
+    """
+    Build a Blender object straight from a meshlib mesh, without a file.
+
+    The counterpart of blender_to_meshlib_triangles for small results: gives
+    the same object as meshlib_to_blender_via_stl (identity transform,
+    vertices scaled by import_scale, linked to the active collection)
+    without the save and import operator.
+    """
+    import numpy as np
+    import bpy
+    from .meshlib_utils import get_mrmeshnumpy
+    mn = get_mrmeshnumpy()
+
+    co = np.asarray(mn.toNumpyArray(meshlib_mesh.points), dtype=np.float64) * float(import_scale)
+    faces = np.asarray(mn.getNumpyFaces(meshlib_mesh.topology), dtype=np.int64)
+
+    new_mesh = bpy.data.meshes.new(name)
+    new_mesh.from_pydata(co, [], faces)
+    new_mesh.update()
+    new_obj = bpy.data.objects.new(name, new_mesh)
+    bpy.context.collection.objects.link(new_obj)
+    return new_obj
+
+
 def select_results(result_objs):
     """Select the given result objects and make the first one active.
     
@@ -342,10 +491,48 @@ def replace_mesh_keep_transforms(original_obj, new_obj):
     return original_obj
 
 
+def small_object_batches(blender_objs, n_workers: int = 4):
+    """
+    Group the small objects of blender_objs into worker batches.
+
+    Only objects without active modifiers or shape keys qualify, since the
+    direct read (blender_to_meshlib_triangles) sees the base mesh only,
+    while the STL route exports the evaluated one.
+
+    Returns:
+        list of index lists; every batch stays under SMALL_BATCH_FACES
+        faces, and there are at least as many batches as workers when
+        there are enough objects to share
+    """
+    import math
+    small = [i for i, obj in enumerate(blender_objs)
+             if not any(mod.show_viewport for mod in obj.modifiers)
+             and obj.data.shape_keys is None
+             and len(obj.data.polygons) <= SMALL_OBJECT_MAX_FACES]
+    if not small:
+        return []
+    faces = {i: max(1, len(blender_objs[i].data.polygons)) for i in small}
+    n_batches = max(min(int(n_workers), len(small)), math.ceil(sum(faces.values()) / SMALL_BATCH_FACES))
+
+    # Largest first onto the lightest batch keeps the batches even
+    batches = [[] for _ in range(n_batches)]
+    loads = [0] * n_batches
+    for i in sorted(small, key=lambda i: -faces[i]):
+        k = loads.index(min(loads))
+        batches[k].append(i)
+        loads[k] += faces[i]
+    return [sorted(b) for b in batches if b]
+
+
 def batch_process_mesh_operation(blender_objs, operation_fn, output_suffix, auto_decimate=False, import_scale=0.1, replace_original=False, resolution=None):
     """
     Optimized batch wrapper for mesh operations on multiple objects.
     Processes each object individually but batches Blender I/O for efficiency.
+
+    Small objects (see SMALL_OBJECT_MAX_FACES) are read and rebuilt directly
+    instead of through STL files and run several to a worker task, so
+    selections of hundreds of small parts are not dominated by per-object
+    export, import and scheduling overhead.
     
     Args:
         blender_objs: List of source Blender mesh objects
@@ -377,111 +564,157 @@ def batch_process_mesh_operation(blender_objs, operation_fn, output_suffix, auto
     prev_selection_names = [obj.name for obj in bpy.context.selected_objects]
     
     try:
-        # Phase 1: Export all objects to STL files (batch export setup)
-        stl_paths = []
-        for obj in blender_objs:
+        # Phase 1: Small objects are read directly; every other object gets
+        # an STL file (batch export setup)
+        n_workers = min(len(blender_objs), 4)
+        batches = []
+        for batch in small_object_batches(blender_objs, n_workers):
+            items = []
+            for i in batch:
+                try:
+                    items.append((i, blender_to_meshlib_triangles(blender_objs[i])[0]))
+                except Exception:
+                    pass  # left to the STL route below
+            if items:
+                batches.append(items)
+        batched = {i for items in batches for i, _ in items}
+
+        stl_paths = {}
+        for i, obj in enumerate(blender_objs):
+            if i in batched:
+                continue
             fd, stl_path = tempfile.mkstemp(prefix=f"qi_batch_{obj.name}_", suffix=".stl", dir=tmp_dir)
             os.close(fd)
-            stl_paths.append(stl_path)
-        
-        # Export each object (Blender requires individual selection for STL export)
-        meshlib_meshes = []
-        initial_face_counts = []
-        initial_vert_counts = []
-        
-        for i, obj in enumerate(blender_objs):
-            # Select only this object
-            for o in bpy.context.selected_objects:
-                o.select_set(False)
-            obj.select_set(True)
-            view_layer.objects.active = obj
-            
-            # Export to STL
-            bpy.ops.wm.stl_export(
-                'EXEC_DEFAULT',
-                filepath=stl_paths[i],
-                export_selected_objects=True,
-                use_batch=False,
-                global_scale=10.0,
-                apply_modifiers=True,
-            )
-            
-            # Load into meshlib
-            loaded = mm.loadMesh(stl_paths[i])
-            mesh = loaded.mesh if hasattr(loaded, 'mesh') else loaded
-            meshlib_meshes.append(mesh)
-            initial_face_counts.append(mesh.topology.numValidFaces())
-            initial_vert_counts.append(mesh.topology.numValidVerts())
-            
-            # Clean up input STL immediately
-            try:
-                os.remove(stl_paths[i])
-            except Exception:
-                pass
+            stl_paths[i] = stl_path
         
         # Phase 2: Process meshes in parallel (pure meshlib, no Blender API).
         # ThreadPoolExecutor lets multiple C++ meshlib operations run concurrently
         # because MeshLib releases the GIL. Worker count is capped to avoid
-        # saturating the GPU if CUDA offsets are in use.
+        # saturating the GPU if CUDA offsets are in use. Each mesh is submitted
+        # as soon as it is exported, so processing overlaps the remaining
+        # exports, and each worker saves its own result (Phase 3) right away.
         from .offset_utils import should_auto_decimate_faces
         from concurrent.futures import ThreadPoolExecutor, as_completed
 
-        n_workers = min(len(meshlib_meshes), 4)
+        initial_face_counts = [0] * len(blender_objs)
+        initial_vert_counts = [0] * len(blender_objs)
 
-        def _process_one(args):
-            i, mesh = args
+        def _run(i, mesh):
+            initial_face_counts[i] = mesh.topology.numValidFaces()
+            initial_vert_counts[i] = mesh.topology.numValidVerts()
             out_mesh = operation_fn(mesh)
             if auto_decimate:
                 final_faces = out_mesh.topology.numValidFaces()
                 do_decimate, target_faces = should_auto_decimate_faces(initial_face_counts[i], final_faces)
                 if do_decimate:
                     out_mesh = decimate_mesh(out_mesh, target_face_count=target_faces, resolution=resolution)
-            return i, out_mesh
+            return out_mesh
+
+        def _process_one(args):
+            i, mesh = args
+            out_mesh = _run(i, mesh)
+
+            # Phase 3: Save the result to STL from the worker (pure file I/O)
+            fd, out_path = tempfile.mkstemp(prefix=f"qi_out_{names[i]}_", suffix=".stl", dir=tmp_dir)
+            os.close(fd)
+            try:
+                mm.saveMesh(out_mesh, out_path)
+            except Exception:
+                mm.saveMeshAs(out_mesh, out_path)
+            return [(i, (out_mesh.topology.numValidVerts(), out_path, None))]
+
+        def _process_batch(items):
+            # Small objects: results stay in memory for the direct rebuild,
+            # and one object failing does not take the rest of the batch down
+            outcomes = []
+            for i, mesh in items:
+                try:
+                    out_mesh = _run(i, mesh)
+                    outcomes.append((i, (out_mesh.topology.numValidVerts(), None, out_mesh)))
+                except Exception as exc:
+                    outcomes.append((i, exc))
+            return outcomes
 
+        names = [obj.name for obj in blender_objs]
         success_map = {}
         error_map = {}
         with ThreadPoolExecutor(max_workers=n_workers) as executor:
-            futures = {executor.submit(_process_one, (i, mesh)): i for i, mesh in enumerate(meshlib_meshes)}
+            futures = {}
+            # Small objects first, so their batches run while the larger
+            # objects are still being exported
+            for items in batches:
+                futures[executor.submit(_process_batch, items)] = [i for i, _ in items]
+            del batches
+
+            # Export each object (Blender requires individual selection for STL export)
+            for i, obj in enumerate(blender_objs):
+                if i in batched:
+                    continue
+                # Select only this object
+                for o in bpy.context.selected_objects:
+                    o.select_set(False)
+                obj.select_set(True)
+                view_layer.objects.active = obj
+                
+                # Export to STL
+                bpy.ops.wm.stl_export(
+                    'EXEC_DEFAULT',
+                    filepath=stl_paths[i],
+                    export_selected_objects=True,
+                    use_batch=False,
+                    global_scale=10.0,
+                    apply_modifiers=True,
+                )
+                
+                # Load into meshlib
+                loaded = mm.loadMesh(stl_paths[i])
+                mesh = loaded.mesh if hasattr(loaded, 'mesh') else loaded
+                
+                # Clean up input STL immediately
+                try:
+                    os.remove(stl_paths[i])
+                except Exception:
+                    pass
+
+                futures[executor.submit(_process_one, (i, mesh))] = [i]
+                del mesh, loaded
+
             for future in as_completed(futures):
-                i = futures[future]
                 try:
-                    idx, out_mesh = future.result()
-                    success_map[idx] = out_mesh
+                    outcomes = future.result()
                 except Exception as exc:
-                    error_map[i] = exc
+                    outcomes = [(i, exc) for i in futures[future]]
+                for idx, outcome in outcomes:
+                    if isinstance(outcome, Exception):
+                        error_map[idx] = outcome
+                    else:
+                        success_map[idx] = outcome
 
         # Rebuild survivors in original order so subsequent phases stay aligned
-        processed_meshes = []
         surviving_indices = []
-        for i in range(len(meshlib_meshes)):
+        output_stl_paths = []
+        output_meshes = []
+        final_vert_counts = []
+        for i in range(len(blender_objs)):
             if i in success_map:
-                processed_meshes.append(success_map[i])
                 surviving_indices.append(i)
+                final_vert_counts.append(success_map[i][0])
+                output_stl_paths.append(success_map[i][1])
+                output_meshes.append(success_map[i][2])
             else:
                 collapsed_objs.append((blender_objs[i], error_map.get(i, RuntimeError("unknown"))))
-
-        # Phase 3: Save surviving meshes to STL in parallel (pure file I/O)
-        output_stl_paths = []
-        for j in range(len(processed_meshes)):
-            src_idx = surviving_indices[j]
-            fd, stl_path = tempfile.mkstemp(prefix=f"qi_out_{blender_objs[src_idx].name}_", suffix=".stl", dir=tmp_dir)
-            os.close(fd)
-            output_stl_paths.append(stl_path)
-
-        def _save_one(args):
-            mesh, stl_path = args
-            try:
-                mm.saveMesh(mesh, stl_path)
-            except Exception:
-                mm.saveMeshAs(mesh, stl_path)
-
-        with ThreadPoolExecutor(max_workers=n_workers) as executor:
-            list(executor.map(_save_one, zip(processed_meshes, output_stl_paths)))
+        del success_map
 
         # Phase 4: Import surviving results back to Blender
         result_objs = []
         for j, stl_path in enumerate(output_stl_paths):
             src_idx = surviving_indices[j]
+            if stl_path is None:
+                # Small object: build the result directly from memory
+                result_objs.append(meshlib_to_blender_direct(
+                    output_meshes[j], blender_objs[src_idx].name + output_suffix, import_scale))
+                output_meshes[j] = None
+                continue
             prev_objs = set(bpy.data.objects)
 
             # Import STL
@@ -510,7 +743,7 @@ def batch_process_mesh_operation(blender_objs, operation_fn, output_suffix, auto
         for j, result_obj in enumerate(result_objs):
             src_idx = surviving_indices[j]
             original_obj = blender_objs[src_idx]
-            final_verts = processed_meshes[j].topology.numValidVerts()
+            final_verts = final_vert_counts[j]
 
             if replace_original:
                 result_obj = replace_mesh_keep_transforms(original_obj, result_obj)
@@ -0,0 +1,356 @@
+"""
+Resin-trap (cavity) analysis for Quick Infill.
+
+Finds the pockets a Heal Cavity run would fill by comparing a coarse dense
+closing of the source against the source itself, without running the full
+grow/shrink/boolean chain.
+"""
+
+import bpy
+from bpy.types import Operator
+from typing import NamedTuple, Optional
+
+from .meshlib_utils import get_meshlib
+from .offset_utils import compute_voxel_size, mesh_content_hash
+from .blender_meshlib_utils import blender_to_meshlib_via_stl
+from .volume_utils import (
+    MAX_DENSE_VOXELS,
+    closing_sdf,
+    dense_grid_for_box,
+    dense_voxel_count,
+    label_components,
+    mesh_to_dense_sdf,
+)
+
+# Custom property used to cache the last analysis on each object
+CAVITY_CACHE_KEY = "quick_infill_cavities"
+
+# Custom property holding the last solved minimal grow on each object
+AUTO_GROW_KEY = "quick_infill_auto_grow"
+
+# Custom property recording the last successful heal of each object
+HEALED_KEY = "quick_infill_healed"
+
+# Default number of voxels for the coarse analysis grid
+ANALYSIS_VOXELS = 1_000_000
+
+
+class Cavity(NamedTuple):
+    volume: float
+    bbox_min: tuple
+    bbox_max: tuple
+    voxels: int
+
+
+class CavityReport(NamedTuple):
+    cavities: list
+    voxel_size: float
+    grow: float
+
+    @property
+    def total_volume(self) -> float:
+        return sum(c.volume for c in self.cavities)
+
+    @property
+    def conclusive(self) -> bool:
+        """False when the grid was too coarse (above half the grow) for the closing to resolve cavities."""
+        return self.voxel_size <= self.grow / 2.0 + 1e-9
+
+    def significant(self, min_volume: float) -> list:
+        """Cavities at least min_volume in size."""
+        return [c for c in self.cavities if c.volume >= min_volume]
+
+
+def analysis_voxel_size(mesh, grow: float, analysis_voxels: int = ANALYSIS_VOXELS, min_resolution: float = 0.0) -> float:
+    """
+    Pick a coarse voxel size for cavity analysis.
+
+    Targets analysis_voxels over the bounding box but stays below half the
+    grow distance so the closing still resolves, unless that would exceed
+    MAX_DENSE_VOXELS.
+    """
+    vs = compute_voxel_size(mesh, int(analysis_voxels), float(min_resolution))
+    vs = min(vs, float(grow) / 2.0)
+
+    box = mesh.computeBoundingBox()
+    while True:
+        _, dims = dense_grid_for_box(box, vs, float(grow) + 2.0 * vs)
+        if dense_voxel_count(dims) <= MAX_DENSE_VOXELS:
+            return vs
+        vs *= 1.25
+
+
+def cavities_from_mask(mask, origin, voxel_size: float, min_voxels: int = 8) -> list:
+    """
+    Split a cavity voxel mask into connected cavities, largest first.
+    """
+    import numpy as np
+
+    labels, count = label_components(mask)
+    if count == 0:
+        return []
+
+    vs = float(voxel_size)
+    idx = np.nonzero(labels)
+    lab = labels[idx] - 1
+    counts = np.bincount(lab, minlength=count)
+
+    lo = np.full((count, 3), np.iinfo(np.int64).max, dtype=np.int64)
+    hi = np.full((count, 3), -1, dtype=np.int64)
+    for axis in range(3):
+        np.minimum.at(lo[:, axis], lab, idx[axis])
+        np.maximum.at(hi[:, axis], lab, idx[axis])
+
+    cavities = []
+    for c in range(count):
+        if counts[c] < min_voxels:
+            continue
+        bbox_min = tuple(float(origin[a] + lo[c, a] * vs) for a in range(3))
+        bbox_max = tuple(float(origin[a] + (hi[c, a] + 1) * vs) for a in range(3))
+        cavities.append(Cavity(float(counts[c]) * vs ** 3, bbox_min, bbox_max, int(counts[c])))
+
+    cavities.sort(key=lambda c: c.volume, reverse=True)
+    return cavities
+
+
+def _source_field(mesh, grow: float, analysis_voxels: int, min_resolution: float):
+    """Coarse grid and source SDF padded far enough for a closing by grow."""
+    vs = analysis_voxel_size(mesh, grow, analysis_voxels, min_resolution)
+    pad = grow + 2.0 * vs
+    origin, dims = dense_grid_for_box(mesh.computeBoundingBox(), vs, pad)
+    src_sdf = mesh_to_dense_sdf(mesh, origin, dims, vs, max_dist=pad)
+    return vs, origin, src_sdf
+
+
+def find_cavities(mesh, grow: float, analysis_voxels: int = ANALYSIS_VOXELS, min_resolution: float = 0.0, min_voxels: int = 8) -> CavityReport:
+    """
+    Detect cavities that a closing by grow would fill.
+
+    A cavity voxel lies inside the closed solid but clearly outside the source
+    (more than half a voxel), which drops surface sampling noise.
+
+    Args:
+        mesh: MeshLib mesh to analyze
+        grow: Closing distance, same meaning as the Heal Cavity grow
+        analysis_voxels: Approximate voxel budget for the coarse grid
+        min_voxels: Cavities smaller than this many voxels are ignored
+
+    Returns:
+        CavityReport with cavities sorted by volume
+    """
+    grow = float(grow)
+    vs, origin, src_sdf = _source_field(mesh, grow, analysis_voxels, min_resolution)
+    closed_sdf = closing_sdf(src_sdf, origin, vs, grow)
+    mask = (closed_sdf < 0.0) & (src_sdf > 0.5 * vs)
+
+    cavities = cavities_from_mask(mask, origin, vs, min_voxels)
+    return CavityReport(cavities, vs, grow)
+
+
+def solve_min_grow(mesh, max_grow: float, coverage: float = 0.95, analysis_voxels: int = ANALYSIS_VOXELS,
+                   min_resolution: float = 0.0, min_voxels: int = 8):
+    """
+    Find the smallest grow distance that still seals every cavity found at max_grow.
+
+    The source is sampled once; each bisection step only re-runs the closing
+    on that cached field. A cavity counts as sealed when at least coverage of
+    its voxels are filled.
+
+    Returns:
+        tuple: (grow or None if there is nothing to seal, CavityReport at max_grow)
+    """
+    import numpy as np
+
+    max_grow = float(max_grow)
+    vs, origin, src_sdf = _source_field(mesh, max_grow, analysis_voxels, min_resolution)
+    outside = src_sdf > 0.5 * vs
+
+    ref_mask = (closing_sdf(src_sdf, origin, vs, max_grow) < 0.0) & outside
+    report = CavityReport(cavities_from_mask(ref_mask, origin, vs, min_voxels), vs, max_grow)
+    if not report.cavities:
+        return None, report
+
+    labels, count = label_components(ref_mask)
+    counts = np.bincount(labels[ref_mask], minlength=count + 1)
+    keep = counts >= min_voxels
+    keep[0] = False
+
+    def sealed(grow):
+        filled = (closing_sdf(src_sdf, origin, vs, grow) < 0.0) & ref_mask
+        hit = np.bincount(labels[filled], minlength=count + 1)
+        return bool(np.all(hit[keep] >= coverage * counts[keep]))
+
+    # Below one voxel the coarse grid cannot tell grow values apart
+    lo, hi = vs, max_grow
+    if sealed(lo):
+        return lo, report
+    tol = max(0.5 * vs, 0.02 * max_grow)
+    while hi - lo > tol:
+        mid = 0.5 * (lo + hi)
+        if sealed(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi, report
+
+
+def store_report(obj, mesh_hash: str, report: CavityReport):
+    """Cache a cavity report on the Blender object as a custom property."""
+    obj[CAVITY_CACHE_KEY] = {
+        "hash": mesh_hash,
+        "grow": float(report.grow),
+        "voxel_size": float(report.voxel_size),
+        "volumes": [c.volume for c in report.cavities],
+        "voxels": [c.voxels for c in report.cavities],
+        "bboxes": [v for c in report.cavities for v in (*c.bbox_min, *c.bbox_max)],
+    }
+
+
+def cached_report(obj, mesh_hash: str, grow: float) -> Optional[CavityReport]:
+    """Return the cached report if it matches the mesh content and grow, else None."""
+    data = obj.get(CAVITY_CACHE_KEY)
+    if data is None:
+        return None
+    try:
+        if data["hash"] != mesh_hash or abs(float(data["grow"]) - float(grow)) > 1e-6:
+            return None
+        volumes = list(data["volumes"])
+        voxels = list(data["voxels"])
+        bboxes = list(data["bboxes"])
+    except (KeyError, TypeError):
+        return None
+
+    cavities = []
+    for i, volume in enumerate(volumes):
+        b = bboxes[6 * i:6 * i + 6]
+        cavities.append(Cavity(float(volume), tuple(b[:3]), tuple(b[3:]), int(voxels[i])))
+    return CavityReport(cavities, float(data["voxel_size"]), float(data["grow"]))
+
+
+
+def store_auto_grow(obj, mesh_hash: str, max_grow: float, grow: Optional[float]):
+    """Remember the solved grow (None when nothing needs sealing) for this mesh and upper bound."""
+    obj[AUTO_GROW_KEY] = {
+        "hash": mesh_hash,
+        "max_grow": float(max_grow),
+        "grow": -1.0 if grow is None else float(grow),
+    }
+
+
+def cached_auto_grow(obj, mesh_hash: str, max_grow: float):
+    """
+    Return (found, grow) for a previously solved grow matching mesh and upper bound.
+    """
+    data = obj.get(AUTO_GROW_KEY)
+    if data is None:
+        return False, None
+    try:
+        if data["hash"] != mesh_hash or abs(float(data["max_grow"]) - float(max_grow)) > 1e-6:
+            return False, None
+        grow = float(data["grow"])
+    except (KeyError, TypeError):
+        return False, None
+    return True, (None if grow < 0.0 else grow)
+
+
+def store_healed(obj, mesh_hash: str, settings_key: str, infill_name: str):
+    """Record that obj (with this content) was healed with these settings into infill_name."""
+    obj[HEALED_KEY] = {"hash": mesh_hash, "settings": settings_key, "infill": infill_name}
+
+
+def already_healed(obj, mesh_hash: str, settings_key: str) -> bool:
+    """True if obj was healed before with identical content and settings and its infill still exists."""
+    data = obj.get(HEALED_KEY)
+    if data is None:
+        return False
+    try:
+        if data["hash"] != mesh_hash or data["settings"] != settings_key:
+            return False
+        infill_name = data["infill"]
+    except (KeyError, TypeError):
+        return False
+    return infill_name in bpy.data.objects
+
+class QUICKINFILL_OT_analyze_cavities(Operator):
+    bl_idname = "quick_infill.analyze_cavities"
+    bl_label = "Analyze Cavities"
+    bl_description = "Report resin-trapping cavities (count, volume, bounds) on selected mesh(es) without healing them"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        try:
+            get_meshlib()
+            s = getattr(context.scene, 'quick_infill_settings', None)
+            grow_val = float(getattr(s, 'grow', 2.0))
+
+            selected_objs = [obj for obj in context.selected_objects if obj.type == 'MESH']
+            if not selected_objs:
+                self.report({'ERROR'}, "No mesh selected.")
+                return {'CANCELLED'}
+
+            from concurrent.futures import ThreadPoolExecutor, as_completed
+
+            # ── Phase 1: Export to meshlib and check cached reports (Blender API, sequential) ──
+            reports = {}
+            pending = {}
+            for i, obj in enumerate(selected_objs):
+                mesh = blender_to_meshlib_via_stl(obj)
+                mesh_hash = mesh_content_hash(mesh)
+                cached = cached_report(obj, mesh_hash, grow_val)
+                if cached is not None:
+                    reports[i] = cached
+                else:
+                    pending[i] = (mesh, mesh_hash)
+
+            # ── Phase 2: Analyze uncached meshes in parallel (pure meshlib) ──
+            if pending:
+                n_workers = min(len(pending), 4)
+                with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                    futures = {executor.submit(find_cavities, mesh, grow_val): i
+                               for i, (mesh, _) in pending.items()}
+                    for future in as_completed(futures):
+                        i = futures[future]
+                        try:
+                            reports[i] = future.result()
+                        except Exception as exc:
+                            print(f"[Quick Infill] Cavity analysis failed for '{selected_objs[i].name}': {exc}")
+
+            # ── Phase 3: Cache and report (Blender API, sequential) ──
+            flagged = 0
+            for i, obj in enumerate(selected_objs):
+                report = reports.get(i)
+                if report is None:
+                    continue
+                if i in pending:
+                    store_report(obj, pending[i][1], report)
+                if report.cavities:
+                    flagged += 1
+                print(f"[Quick Infill] Cavities in '{obj.name}': {len(report.cavities)} "
+                      f"(total {report.total_volume:.2f} mm³, voxel {report.voxel_size:.3f})")
+                for n, c in enumerate(report.cavities):
+                    print(f"    #{n + 1}: {c.volume:.2f} mm³  "
+                          f"min ({c.bbox_min[0]:.2f}, {c.bbox_min[1]:.2f}, {c.bbox_min[2]:.2f})  "
+                          f"max ({c.bbox_max[0]:.2f}, {c.bbox_max[1]:.2f}, {c.bbox_max[2]:.2f})")
+
+            if len(selected_objs) == 1 and 0 in reports:
+                report = reports[0]
+                if report.cavities:
+                    self.report({'INFO'}, f"Found {len(report.cavities)} cavities, {report.total_volume:.2f} mm³ total (see console)")
+                else:
+                    self.report({'INFO'}, "No cavities found.")
+            else:
+                self.report({'INFO'}, f"{flagged} of {len(selected_objs)} objects have cavities (see console)")
+            return {'FINISHED'}
+
+        except Exception as e:
+            self.report({'ERROR'}, f"Cavity analysis failed: {e}")
+            print(f"[Quick Infill] Cavity analysis error: {e}")
+            return {'CANCELLED'}
+
+
+def register():
+    bpy.utils.register_class(QUICKINFILL_OT_analyze_cavities)
+
+
+def unregister():
+    bpy.utils.unregister_class(QUICKINFILL_OT_analyze_cavities)
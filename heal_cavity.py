@@ -1,6 +1,15 @@
 import bpy
 from bpy.types import Operator
-from .offset_utils import cuda_offset, weighted_dist_shell, compute_voxel_size
+from .offset_utils import (
+    COMPONENT_GAP_VOXELS,
+    compute_voxel_size,
+    cuda_offset,
+    invalidate_mesh_stats,
+    mesh_stats,
+    padded_envelope,
+    process_components,
+    weighted_dist_shell,
+)
 from .blender_meshlib_utils import (
     blender_to_meshlib,
     blender_to_meshlib_via_stl,
@@ -8,6 +17,171 @@ from .blender_meshlib_utils import (
     meshlib_to_blender_via_stl,
 )
 
+def heal_mesh(src_mesh, vox, grow, shrink_mult, method="ACCURATE", trim_thin=False,
+              max_vertices=1_000_000, target_resolution=None,
+              fwn=None, grow_mesh=None, shrink_mesh=None, shell_prep=None, spill=None):
+    """
+    Run the Heal Cavity offset chain on a meshlib mesh and return the infill.
+
+    Pure meshlib (no Blender API), so it can run on worker threads. The
+    optional fwn / grow_mesh / shrink_mesh / shell_prep arguments let a
+    caller share intermediates between runs that only differ in later
+    parameters: grow_mesh depends on grow; shrink_mesh (ACCURATE) and
+    shell_prep (prepare_dist_shell(shrink_mesh, src_mesh)) only on grow too.
+
+    Each stage drops its inputs as soon as they are consumed. With a
+    MeshSpillStore as spill, the source (which ACCURATE needs again after
+    the shrink) is parked on disk while over budget; src_mesh may also be
+    passed already parked. Callers must not hold their own reference to
+    src_mesh for the release to take effect.
+    """
+    from .meshlib_utils import get_meshlib
+    mm, _ = get_meshlib()
+
+    def _restore(mesh):
+        return spill.restore(mesh) if spill is not None else mesh
+
+    def _sample():
+        if spill is not None:
+            spill.sample()
+
+    if grow_mesh is None:
+        src_live = _restore(src_mesh)
+        grow_mesh = cuda_offset(src_live, vox, grow, fwn=fwn)
+        _sample()
+        if method == "ACCURATE" and spill is not None:
+            src_mesh = spill.park(src_live)
+        del src_live
+
+    if method == "NAIVE":
+        del src_mesh
+        shrink_mesh = cuda_offset(grow_mesh, vox, -grow * shrink_mult)
+        del grow_mesh
+        _sample()
+        # Smooth step: shrink then grow by one voxel to clean artifacts
+        out_mesh = shrink_mesh
+        del shrink_mesh
+    else:
+        if shrink_mesh is None:
+            shrink_mesh = cuda_offset(grow_mesh, vox, -grow)
+            _sample()
+        del grow_mesh
+        shell_mesh = weighted_dist_shell(shrink_mesh, _restore(src_mesh), vox, shrink_mult, max_vertices=max_vertices,
+                                         target_resolution=target_resolution, prepared=shell_prep)
+        del src_mesh, shell_prep
+        _sample()
+        out_mesh = mm.boolean(shrink_mesh, shell_mesh, mm.BooleanOperation.DifferenceAB).mesh
+        del shrink_mesh, shell_mesh
+        _sample()
+
+    # Apply trimThin if enabled
+    if trim_thin:
+        ss_mesh_shrink = cuda_offset(out_mesh, vox, -vox)
+        del out_mesh
+        out_mesh = cuda_offset(ss_mesh_shrink, vox, vox)
+        del ss_mesh_shrink
+        _sample()
+    return out_mesh
+
+
+def transfer_detail(out_mesh, proxy_mesh, detail_mesh, tolerance, reach, max_faces=None):
+    """
+    Carry the full-resolution source detail over onto a heal run on a proxy.
+
+    Where the infill follows the source (an inward offset of it), the
+    proxy's and the original's surfaces are found along each result
+    vertex's normal within reach, and the vertex moves by their difference,
+    so the offset follows the original's surface instead of the
+    proxy's. Those triangles are first subdivided toward the original's
+    edge length. Newly generated infill surfaces, with no source surface in
+    reach or with the two surfaces apart by more than tolerance, keep the
+    proxy geometry, so the result stays one watertight surface.
+    Correspondence comes from batched ray casts against both meshes' AABB
+    trees.
+
+    Args:
+        out_mesh: Heal result; modified in place and returned
+        proxy_mesh: Decimated source the heal actually ran on
+        detail_mesh: Full-resolution source in the same coordinates
+        tolerance: Largest proxy-to-original distance still carried over
+            (about the proxy's decimation error)
+        reach: Largest distance from the result to the source surface
+            (the shell thickness plus a voxel)
+        max_faces: Cap on faces added by the subdivision (defaults to the
+            original's face count)
+    """
+    import math
+    import numpy as np
+    from .meshlib_utils import get_meshlib, get_mrmeshnumpy
+    from .support_tools import cast_parallel_rays
+    mm, _ = get_meshlib()
+    mn = get_mrmeshnumpy()
+
+    tol = float(tolerance)
+    proxy_mesh.getAABBTree()
+    detail_mesh.getAABBTree()
+
+    def _displacement(verts):
+        # Rays start just inside each vertex and run outward along its normal
+        pts = np.asarray(mn.toNumpyArray(out_mesh.points), dtype=np.float64)
+        normals = np.asarray(mn.toNumpyArray(mm.computePerVertNormals(out_mesh)), dtype=np.float64)
+        pts, normals = pts[verts], normals[:len(pts)][verts]
+        origins = pts - tol * normals
+        to_proxy = cast_parallel_rays(proxy_mesh, origins, normals).astype(np.float64)
+        to_detail = cast_parallel_rays(detail_mesh, origins, normals).astype(np.float64)
+        shift = to_detail - to_proxy
+        with np.errstate(invalid="ignore"):
+            matched = (to_proxy <= reach + tol) & (np.abs(shift) <= tol)
+        return pts, np.where(matched, shift, 0.0)[:, None] * normals, matched
+
+    _, _, matched = _displacement(slice(None))
+    faces = mn.getNumpyFaces(out_mesh.topology)
+    valid_faces = np.asarray(mn.getNumpyBitSet(out_mesh.topology.getValidFaces()), dtype=bool)[:len(faces)]
+    keep = valid_faces & matched[faces].all(axis=1)
+    if not keep.any():
+        return out_mesh
+
+    # Edge length of an equilateral triangle with the original's mean area
+    detail = mesh_stats(detail_mesh)
+    edge_len = math.sqrt(4.0 * detail.area / (math.sqrt(3.0) * max(detail.faces, 1)))
+    region = mn.faceBitSetFromBools(keep)
+    settings = mm.SubdivideSettings()
+    settings.maxEdgeLen = edge_len
+    # Each edge split adds two faces
+    settings.maxEdgeSplits = int(max_faces if max_faces is not None else detail.faces) // 2
+    settings.region = region
+    if settings.maxEdgeSplits > 0:
+        mm.subdivideMesh(out_mesh, settings)
+
+    region_faces = np.asarray(mn.getNumpyBitSet(region), dtype=bool)[:out_mesh.topology.faceSize()].nonzero()[0]
+    verts = np.unique(mn.getNumpyFaces(out_mesh.topology)[region_faces])
+    pts, shift, _ = _displacement(verts)
+    all_pts = np.asarray(mn.toNumpyArray(out_mesh.points), dtype=np.float64)
+    all_pts[verts] = pts + shift
+    out_mesh.points = mn.fromNumpyArray(all_pts)
+    out_mesh.invalidateCaches()
+    invalidate_mesh_stats(out_mesh)
+    return out_mesh
+
+
+def auto_decimate_result(out_mesh, initial_face_count, vox):
+    """
+    Decimate a heal result if it grew well past the source face count.
+
+    Returns:
+        tuple: (mesh, final face count)
+    """
+    from .offset_utils import decimate_mesh, should_auto_decimate_faces
+    final_face_count = out_mesh.topology.numValidFaces()
+    do_decimate, target_faces = should_auto_decimate_faces(initial_face_count, final_face_count)
+    if not do_decimate:
+        return out_mesh, final_face_count
+    out_mesh = decimate_mesh(out_mesh, target_face_count=target_faces, resolution=vox)
+    new_final_count = out_mesh.topology.numValidFaces()
+    print(f"Decimated output mesh from {final_face_count} to {new_final_count} faces (target: {target_faces})")
+    return out_mesh, new_final_count
+
+
 class QUICKINFILL_OT_heal_cavity(Operator):
     bl_idname = "quick_infill.heal_cavity"
     bl_label = "Heal Cavity"
@@ -41,6 +215,13 @@ class QUICKINFILL_OT_heal_cavity(Operator):
             shrink_mult_val = _cf(getattr(s, 'shrink_mult', 1.5), 1.5)
             method = getattr(s, 'method', 'NAIVE')
             trim_thin_val = getattr(s, 'trim_thin', False)
+            auto_grow_val = getattr(s, 'auto_grow', False)
+            skip_clean_val = getattr(s, 'skip_clean', False)
+            min_cavity_volume_val = _cf(getattr(s, 'min_cavity_volume', 0.5), 0.5)
+            low_memory_val = getattr(s, 'low_memory', False)
+            split_components_val = getattr(s, 'split_components', False)
+            proxy_detail_val = getattr(s, 'proxy_detail', False)
+            memory_budget_val = _cf(getattr(s, 'memory_budget_gb', 8.0), 8.0)
 
 
             # Get selected mesh
@@ -55,18 +236,76 @@ class QUICKINFILL_OT_heal_cavity(Operator):
             INITIAL_VERTEX_COUNT = src_mesh.topology.numValidVerts()
             INITIAL_FACE_COUNT = src_mesh.topology.numValidFaces()
             print(f"Initial mesh: {INITIAL_VERTEX_COUNT} vertices, {INITIAL_FACE_COUNT} faces")
-            
-            # Decimate if mesh exceeds target resolution limit
+
+            obj_name = src_mesh_blender.name
+            mesh_hash = None
+            settings_key = (f"{grow_val:.4f}|{shrink_mult_val:.4f}|{method}|{bool(trim_thin_val)}|{bool(auto_grow_val)}|"
+                            f"{voxel_mode}|{resolution_val:.4f}|{float(target_res_millions):.3f}")
+            if skip_clean_val or auto_grow_val:
+                from .offset_utils import mesh_content_hash
+                from .cavity_analysis import (
+                    already_healed, cached_auto_grow, cached_report, find_cavities,
+                    solve_min_grow, store_auto_grow, store_report,
+                )
+                mesh_hash = mesh_content_hash(src_mesh)
+
+            # Early skip: same content already healed with these settings
+            if skip_clean_val and already_healed(src_mesh_blender, mesh_hash, settings_key):
+                print(f"[Quick Infill] '{obj_name}' already healed with these settings, skipping")
+                self.report({'INFO'}, f"Nothing to heal: '{obj_name}' already healed with these settings")
+                return {'FINISHED'}
+
+            # Auto grow: smallest grow up to the configured one that seals all cavities
+            cavity_report = None
+            if auto_grow_val:
+                found, solved = cached_auto_grow(src_mesh_blender, mesh_hash, grow_val)
+                if not found:
+                    solved, cavity_report = solve_min_grow(src_mesh, grow_val)
+                    store_auto_grow(src_mesh_blender, mesh_hash, grow_val, solved)
+                    store_report(src_mesh_blender, mesh_hash, cavity_report)
+                else:
+                    cavity_report = cached_report(src_mesh_blender, mesh_hash, grow_val)
+                if solved is None:
+                    print(f"Auto grow: no cavities sealed by grow {grow_val:.3f}, keeping it")
+                else:
+                    print(f"Auto grow: {solved:.3f} (max {grow_val:.3f}){' [cached]' if found else ''}")
+                    self.report({'INFO'}, f"Auto grow: {solved:.3f} mm")
+
+            # Early skip: coarse closing finds no cavity above the volume threshold
+            if skip_clean_val:
+                if cavity_report is None:
+                    cavity_report = cached_report(src_mesh_blender, mesh_hash, grow_val)
+                if cavity_report is None:
+                    cavity_report = find_cavities(src_mesh, grow_val)
+                    store_report(src_mesh_blender, mesh_hash, cavity_report)
+                if not cavity_report.conclusive:
+                    # A grid coarser than half the grow cannot resolve the closing
+                    print(f"[Quick Infill] '{obj_name}': cavity check inconclusive "
+                          f"(voxel {cavity_report.voxel_size:.3f} > grow/2), healing anyway")
+                elif not cavity_report.significant(min_cavity_volume_val):
+                    print(f"[Quick Infill] '{obj_name}': no cavity >= {min_cavity_volume_val:.3f} mm³ "
+                          f"({len(cavity_report.cavities)} smaller), skipping")
+                    self.report({'INFO'}, f"Nothing to heal: no cavity above {min_cavity_volume_val:g} mm³")
+                    return {'FINISHED'}
+
+            if auto_grow_val and solved is not None:
+                grow_val = solved
+
+            # Decimate if mesh exceeds target resolution limit; with Proxy
+            # Detail the decimated mesh is only a proxy for the heal and the
+            # full-resolution source is kept for the transfer back
+            detail_mesh = None
             if INITIAL_VERTEX_COUNT > max_vertices_limit:
                 from .offset_utils import decimate_mesh
                 reduction_ratio = max_vertices_limit / INITIAL_VERTEX_COUNT
+                if proxy_detail_val and not low_memory_val:
+                    detail_mesh = src_mesh
+                    src_mesh = mm.copyMesh(src_mesh)
                 src_mesh = decimate_mesh(src_mesh, reduction_ratio=reduction_ratio)
                 new_vertex_count = src_mesh.topology.numValidVerts()
                 print(f"Decimated mesh from {INITIAL_VERTEX_COUNT} to {new_vertex_count} vertices (target: {max_vertices_limit})")
                 self.report({'INFO'}, f"Decimated mesh: {INITIAL_VERTEX_COUNT} → {new_vertex_count} vertices")
 
-            obj_name = src_mesh_blender.name
-
             # Calculate voxel size via helper or direct, based on mode
             if voxel_mode == 'RESOLUTION':
                 vox = float(resolution_val)
@@ -74,37 +313,69 @@ class QUICKINFILL_OT_heal_cavity(Operator):
                 vox = compute_voxel_size(src_mesh, int(target_voxels_val), float(resolution_val))
             print(f"Voxel Size: {vox}")
 
-            if method == "NAIVE":
-                grow_mesh = cuda_offset(src_mesh, vox, grow_val)
-                shrink_mesh = cuda_offset(grow_mesh, vox, -grow_val*shrink_mult_val)
-                # Smooth step: shrink then grow by one voxel to clean artifacts
-                out_mesh = shrink_mesh
-            else:
-                # Use helpers from offset_utils
-                # Process mesh
-                grow_mesh = cuda_offset(src_mesh, vox, grow_val)
-                shrink_mesh = cuda_offset(grow_mesh, vox, -grow_val)
-                shell_mesh = weighted_dist_shell(shrink_mesh, src_mesh, vox, shrink_mult_val, max_vertices=max_vertices_limit, target_resolution=int(target_res_millions * 1_000_000))
-                trim_mesh = mm.boolean(shrink_mesh, shell_mesh, mm.BooleanOperation.DifferenceAB).mesh
-                out_mesh = trim_mesh
-
-            # Apply trimThin if enabled
-            if trim_thin_val:
-                ss_mesh_shrink = cuda_offset(out_mesh, vox, -vox)
-                out_mesh = cuda_offset(ss_mesh_shrink, vox, vox)
-            
+            spill = None
+            if low_memory_val:
+                from .memory_utils import MeshSpillStore
+                spill = MeshSpillStore(budget_mb=memory_budget_val * 1024)
+                # Hand the source over to the pipeline with no reference left in
+                # this frame, so heal_mesh can release it, or park it on disk
+                # once over budget
+                handoff = [spill.park(src_mesh)]
+                src_mesh = None
+            try:
+                if split_components_val and spill is None:
+                    # Separate parts heal in their own grids; parts whose grown
+                    # shells could meet are kept in one group
+                    out_mesh = process_components(
+                        src_mesh,
+                        lambda part: heal_mesh(
+                            part, vox, grow_val, shrink_mult_val, method, trim_thin_val,
+                            max_vertices=max_vertices_limit, target_resolution=int(target_res_millions * 1_000_000),
+                        ),
+                        padded_envelope(grow_val + COMPONENT_GAP_VOXELS * vox),
+                    )
+                else:
+                    out_mesh = heal_mesh(
+                        src_mesh if spill is None else handoff.pop(), vox, grow_val, shrink_mult_val, method, trim_thin_val,
+                        max_vertices=max_vertices_limit, target_resolution=int(target_res_millions * 1_000_000),
+                        spill=spill,
+                    )
+            finally:
+                if spill is not None:
+                    spill.cleanup()
+
+            # Surfaces that follow the source take its full-resolution detail
+            # back; only the new infill surfaces keep the proxy's
+            if detail_mesh is not None:
+                proxy_faces = out_mesh.topology.numValidFaces()
+                # Budget the added faces so auto decimation does not undo the transfer
+                # Tolerance covers decimate_mesh's default maxError (0.5% of the diagonal)
+                tolerance = max(vox, 0.005 * mesh_stats(detail_mesh).diagonal)
+                out_mesh = transfer_detail(out_mesh, src_mesh, detail_mesh, tolerance, grow_val * shrink_mult_val + vox,
+                                           max_faces=max(0, INITIAL_FACE_COUNT - proxy_faces))
+                del detail_mesh
+                print(f"[Quick Infill] Proxy detail: {proxy_faces} → {out_mesh.topology.numValidFaces()} faces")
+            del src_mesh
+
             # Decimate output mesh if face count increased significantly
-            from .offset_utils import decimate_mesh, should_auto_decimate_faces
             final_face_count = out_mesh.topology.numValidFaces()
-            do_decimate, target_faces = should_auto_decimate_faces(INITIAL_FACE_COUNT, final_face_count)
-            if do_decimate:
-                out_mesh = decimate_mesh(out_mesh, target_face_count=target_faces, resolution=vox)
-                new_final_count = out_mesh.topology.numValidFaces()
-                print(f"Decimated output mesh from {final_face_count} to {new_final_count} faces (target: {target_faces})")
+            out_mesh, new_final_count = auto_decimate_result(out_mesh, INITIAL_FACE_COUNT, vox)
+            if new_final_count != final_face_count:
                 self.report({'INFO'}, f"Decimated result: {final_face_count} → {new_final_count} faces")
         
             infill_obj = meshlib_to_blender_via_stl(out_mesh, obj_name + "Infill", import_scale=0.1)
+            if mesh_hash is not None:
+                from .cavity_analysis import store_healed
+                store_healed(src_mesh_blender, mesh_hash, settings_key, infill_obj.name)
             
+            if spill is not None:
+                from .memory_utils import format_bytes, peak_rss_bytes
+                del out_mesh
+                spill.sample()
+                print(f"[Quick Infill] Peak RSS during heal: {format_bytes(spill.peak_sampled)} "
+                      f"(process peak {format_bytes(peak_rss_bytes())}, {spill.spilled} spills)")
+                self.report({'INFO'}, f"Peak memory: {format_bytes(spill.peak_sampled)}")
+
             self.report({'INFO'}, f"Heal Cavity completed. Created '{obj_name}Infill'")
             return {'FINISHED'}
 
@@ -0,0 +1,220 @@
+"""
+Heal Cavity parameter sweep for Quick Infill.
+
+Evaluates a grid of grow x shrink_mult x method on one object, sharing the
+intermediates that only depend on grow, and reports runtime, face count and
+fill volume per combination.
+"""
+
+import bpy
+from bpy.types import Operator
+from bpy.props import StringProperty, EnumProperty, BoolProperty
+from typing import NamedTuple
+
+from .offset_utils import cuda_offset, compute_voxel_size, prepare_dist_shell
+from .blender_meshlib_utils import blender_to_meshlib_via_stl, meshlib_to_blender_via_stl
+from .heal_cavity import heal_mesh, auto_decimate_result
+
+# Text datablock that receives the CSV table
+SWEEP_TEXT_NAME = "QuickInfillSweep.csv"
+
+
+class SweepRow(NamedTuple):
+    grow: float
+    shrink_mult: float
+    method: str
+    seconds: float
+    faces: int
+    fill_volume: float
+
+
+def parse_values(text: str) -> list:
+    """Parse '1, 1.5 2' into sorted unique floats."""
+    values = set()
+    for token in text.replace(";", ",").replace(" ", ",").split(","):
+        token = token.strip()
+        if token:
+            values.add(float(token))
+    return sorted(values)
+
+
+def run_heal_sweep(src_mesh, vox, grows, shrink_mults, methods, trim_thin=False,
+                   max_vertices=1_000_000, target_resolution=None, initial_face_count=None,
+                   keep_meshes=False, n_workers=4):
+    """
+    Run Heal Cavity over every (grow, shrink_mult, method) combination.
+
+    Shared across combinations: one FastWindingNumber of the source, one grow
+    mesh per grow value and, for ACCURATE, one shrink mesh plus shell distance
+    preparation per grow value. Row seconds include the shared work the
+    combination depends on, so they are comparable to a standalone run.
+    fill_volume is the infill volume minus the source volume.
+
+    Returns:
+        tuple: (list of SweepRow, dict of (grow, shrink_mult, method) -> mesh if keep_meshes)
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from .meshlib_utils import get_meshlib
+    _, mc = get_meshlib()
+
+    if initial_face_count is None:
+        initial_face_count = src_mesh.topology.numValidFaces()
+    fwn = mc.FastWindingNumber(src_mesh)
+    src_volume = float(src_mesh.volume())
+    need_accurate = "ACCURATE" in methods
+
+    def _shared(grow):
+        t0 = time.perf_counter()
+        grow_mesh = cuda_offset(src_mesh, vox, grow, fwn=fwn)
+        t1 = time.perf_counter()
+        shrink_mesh = shell_prep = None
+        if need_accurate:
+            shrink_mesh = cuda_offset(grow_mesh, vox, -grow)
+            shell_prep = prepare_dist_shell(shrink_mesh, src_mesh, max_vertices)
+        t2 = time.perf_counter()
+        return grow_mesh, shrink_mesh, shell_prep, t1 - t0, t2 - t1
+
+    def _combo(grow, mult, method):
+        grow_mesh, shrink_mesh, shell_prep, t_grow, t_acc = shared[grow]
+        t0 = time.perf_counter()
+        out = heal_mesh(src_mesh, vox, grow, mult, method, trim_thin,
+                        max_vertices=max_vertices, target_resolution=target_resolution,
+                        grow_mesh=grow_mesh, shrink_mesh=shrink_mesh, shell_prep=shell_prep)
+        out, faces = auto_decimate_result(out, initial_face_count, vox)
+        seconds = time.perf_counter() - t0 + t_grow + (t_acc if method == "ACCURATE" else 0.0)
+        return SweepRow(grow, mult, method, seconds, faces, float(out.volume()) - src_volume), out
+
+    # ── Phase 1: Intermediates shared per grow value ──
+    with ThreadPoolExecutor(max_workers=max(1, min(len(grows), n_workers))) as executor:
+        shared = dict(zip(grows, executor.map(_shared, grows)))
+
+    # ── Phase 2: Every combination from the shared intermediates ──
+    combos = [(g, m, meth) for g in grows for m in shrink_mults for meth in methods]
+    with ThreadPoolExecutor(max_workers=max(1, min(len(combos), n_workers))) as executor:
+        results = list(executor.map(lambda c: _combo(*c), combos))
+
+    rows = [row for row, _ in results]
+    meshes = {c: out for c, (_, out) in zip(combos, results)} if keep_meshes else {}
+    return rows, meshes
+
+
+def rows_to_csv(rows) -> str:
+    lines = ["grow,shrink_mult,method,seconds,faces,fill_volume_mm3"]
+    for r in rows:
+        lines.append(f"{r.grow:.4f},{r.shrink_mult:.4f},{r.method},{r.seconds:.3f},{r.faces},{r.fill_volume:.4f}")
+    return "\n".join(lines) + "\n"
+
+
+class QUICKINFILL_OT_heal_sweep(Operator):
+    bl_idname = "quick_infill.heal_sweep"
+    bl_label = "Heal Cavity Sweep"
+    bl_description = "Run Heal Cavity over a grid of grow, shrink multiplier and method values and tabulate the results"
+    bl_options = {'REGISTER'}
+
+    grow_values: StringProperty(  # type: ignore
+        name="Grow Values",
+        description="Comma separated grow distances",
+        default="1.0, 1.5, 2.0",
+    )
+    shrink_mult_values: StringProperty(  # type: ignore
+        name="Shrink Mult Values",
+        description="Comma separated shrink multipliers",
+        default="1.0, 1.5",
+    )
+    methods: EnumProperty(  # type: ignore
+        name="Methods",
+        items=[
+            ("ACCURATE", "Accurate", "High-quality accurate method"),
+            ("NAIVE", "Naive", "Fast naive method"),
+        ],
+        options={'ENUM_FLAG'},
+        default={'ACCURATE', 'NAIVE'},
+    )
+    import_results: BoolProperty(  # type: ignore
+        name="Import Results",
+        description="Import every combination's infill as a separate object",
+        default=False,
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        try:
+            from .meshlib_utils import get_meshlib
+            get_meshlib()
+            s = getattr(context.scene, 'quick_infill_settings', None)
+
+            try:
+                grows = parse_values(self.grow_values)
+                mults = parse_values(self.shrink_mult_values)
+            except ValueError:
+                self.report({'ERROR'}, "Grow and shrink values must be comma separated numbers.")
+                return {'CANCELLED'}
+            methods = [m for m in ("ACCURATE", "NAIVE") if m in self.methods]
+            if not grows or not mults or not methods:
+                self.report({'ERROR'}, "Sweep needs at least one grow, shrink multiplier and method.")
+                return {'CANCELLED'}
+
+            selected_objs = [obj for obj in context.selected_objects if obj.type == 'MESH']
+            if not selected_objs:
+                self.report({'ERROR'}, "No mesh selected.")
+                return {'CANCELLED'}
+            src_obj = selected_objs[0]
+
+            target_res_millions = float(getattr(s, 'target_res', 1.0))
+            max_vertices_limit = int(target_res_millions * 1_000_000)
+            resolution_val = float(getattr(s, 'resolution', 0.1))
+            voxel_mode = getattr(s, 'voxel_mode', 'TARGET_VOXELS')
+            trim_thin_val = bool(getattr(s, 'trim_thin', False))
+
+            # ── Phase 1: Export and prepare the source (Blender API, sequential) ──
+            src_mesh = blender_to_meshlib_via_stl(src_obj)
+            initial_faces = src_mesh.topology.numValidFaces()
+            initial_verts = src_mesh.topology.numValidVerts()
+            if initial_verts > max_vertices_limit:
+                from .offset_utils import decimate_mesh
+                src_mesh = decimate_mesh(src_mesh, reduction_ratio=max_vertices_limit / initial_verts)
+            if voxel_mode == 'RESOLUTION':
+                vox = resolution_val
+            else:
+                vox = compute_voxel_size(src_mesh, max_vertices_limit, resolution_val)
+
+            # ── Phase 2: Sweep (pure meshlib, parallel) ──
+            rows, meshes = run_heal_sweep(
+                src_mesh, vox, grows, mults, methods, trim_thin_val,
+                max_vertices=max_vertices_limit, target_resolution=max_vertices_limit,
+                initial_face_count=initial_faces, keep_meshes=self.import_results,
+            )
+
+            # ── Phase 3: Report and optionally import (Blender API, sequential) ──
+            csv_text = rows_to_csv(rows)
+            text = bpy.data.texts.get(SWEEP_TEXT_NAME) or bpy.data.texts.new(SWEEP_TEXT_NAME)
+            text.clear()
+            text.write(f"# {src_obj.name}, voxel {vox:.4f}\n")
+            text.write(csv_text)
+
+            print(f"[Quick Infill] Heal sweep on '{src_obj.name}' (voxel {vox:.4f}):")
+            print(f"    {'grow':>7} {'mult':>6} {'method':>9} {'time s':>8} {'faces':>9} {'fill mm³':>11}")
+            for r in rows:
+                print(f"    {r.grow:7.3f} {r.shrink_mult:6.2f} {r.method:>9} {r.seconds:8.2f} {r.faces:9d} {r.fill_volume:11.3f}")
+
+            for (g, m, meth), out in meshes.items():
+                meshlib_to_blender_via_stl(out, f"{src_obj.name}Infill_g{g:g}_m{m:g}_{meth.lower()}", import_scale=0.1)
+
+            self.report({'INFO'}, f"Sweep finished: {len(rows)} combinations, table in '{SWEEP_TEXT_NAME}'")
+            return {'FINISHED'}
+
+        except Exception as e:
+            self.report({'ERROR'}, f"Heal sweep failed: {e}")
+            print(f"[Quick Infill] Heal sweep error: {e}")
+            return {'CANCELLED'}
+
+
+def register():
+    bpy.utils.register_class(QUICKINFILL_OT_heal_sweep)
+
+
+def unregister():
+    bpy.utils.unregister_class(QUICKINFILL_OT_heal_sweep)
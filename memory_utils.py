@@ -0,0 +1,154 @@
+"""
+Memory helpers for Quick Infill.
+
+Process RSS readings (current and peak) without extra dependencies, and a
+small spill store that parks meshlib meshes on disk while they are not
+needed and the process is over a memory budget.
+"""
+
+import os
+import sys
+
+
+def _windows_memory_counters():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    get_info = ctypes.windll.psapi.GetProcessMemoryInfo
+    get_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not get_info(handle, ctypes.byref(counters), counters.cb):
+        return None
+    return counters
+
+
+def _proc_status_kb(field: str):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process in bytes, or 0 if unavailable."""
+    try:
+        if sys.platform == "win32":
+            counters = _windows_memory_counters()
+            return int(counters.WorkingSetSize) if counters else 0
+        kb = _proc_status_kb("VmRSS")
+        if kb is not None:
+            return kb * 1024
+    except Exception:
+        pass
+    # macOS has no cheap current RSS without extra modules; fall back to the peak
+    return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Process-lifetime peak resident set size in bytes, or 0 if unavailable."""
+    try:
+        if sys.platform == "win32":
+            counters = _windows_memory_counters()
+            return int(counters.PeakWorkingSetSize) if counters else 0
+        kb = _proc_status_kb("VmHWM")
+        if kb is not None:
+            return kb * 1024
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+    except Exception:
+        return 0
+
+
+def format_bytes(n: int) -> str:
+    return f"{n / (1024 ** 3):.2f} GB" if n >= 1024 ** 3 else f"{n / (1024 ** 2):.0f} MB"
+
+
+class SpilledMesh:
+    """Handle for a mesh that was written to disk by MeshSpillStore."""
+
+    __slots__ = ("path", "faces")
+
+    def __init__(self, path: str, faces: int):
+        self.path = path
+        self.faces = faces
+
+
+class MeshSpillStore:
+    """
+    Park intermediate meshes on disk when the process is over budget.
+
+    park() returns either the mesh itself (under budget) or a SpilledMesh;
+    restore() accepts both, so pipeline code can treat them the same. The
+    caller must drop its own reference to the mesh after parking it for the
+    memory to actually be released. Also tracks the highest RSS seen at
+    sample() points.
+    """
+
+    def __init__(self, budget_mb: float = 0.0, tmp_dir=None):
+        import tempfile
+        self.budget_bytes = int(float(budget_mb) * 1024 * 1024)
+        self._dir = tempfile.mkdtemp(prefix="quick_infill_spill_", dir=tmp_dir)
+        self._count = 0
+        self.spilled = 0
+        self.peak_sampled = current_rss_bytes()
+
+    def sample(self) -> int:
+        rss = current_rss_bytes()
+        self.peak_sampled = max(self.peak_sampled, rss)
+        return rss
+
+    def over_budget(self) -> bool:
+        return self.budget_bytes > 0 and self.sample() > self.budget_bytes
+
+    def park(self, mesh, force: bool = False):
+        """Spill mesh to disk if over budget (or force); returns the mesh or a SpilledMesh."""
+        if isinstance(mesh, SpilledMesh) or not (force or self.over_budget()):
+            return mesh
+        from .meshlib_utils import get_mrmeshpy
+        mm = get_mrmeshpy()
+        self._count += 1
+        # Binary PLY: indexed, compact and fast to write/read back losslessly
+        path = os.path.join(self._dir, f"stage_{self._count}.ply")
+        mm.saveMesh(mesh, path)
+        self.spilled += 1
+        print(f"[Quick Infill] Spilled intermediate ({mesh.topology.numValidFaces()} faces) to disk")
+        return SpilledMesh(path, mesh.topology.numValidFaces())
+
+    def restore(self, handle):
+        """Return a live mesh for a parked handle (loading and deleting the spill file)."""
+        if not isinstance(handle, SpilledMesh):
+            return handle
+        from .meshlib_utils import get_mrmeshpy
+        mm = get_mrmeshpy()
+        mesh = mm.loadMesh(handle.path)
+        try:
+            os.remove(handle.path)
+        except OSError:
+            pass
+        return mesh
+
+    def cleanup(self):
+        import shutil
+        shutil.rmtree(self._dir, ignore_errors=True)
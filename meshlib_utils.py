@@ -32,4 +32,10 @@ def get_mrmeshpy():
 def get_mrcudapy():
     """Get just the mrcudapy module."""
     _, mc = get_meshlib()
-    return mc
\ No newline at end of file
+    return mc
+
+def get_mrmeshnumpy():
+    """Get the mrmeshnumpy module (numpy views of meshes and volumes)."""
+    get_meshlib()
+    import meshlib.mrmeshnumpy as mn
+    return mn
\ No newline at end of file
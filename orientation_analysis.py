@@ -0,0 +1,277 @@
+"""
+Print-orientation search for Quick Infill.
+
+Scores a dense sphere of candidate up directions by undercut area and by the
+material Fix Undercuts would add, so a good print orientation can be picked
+before running any fix. Cheap face-normal classification ranks every
+candidate; the most promising ones are then checked with batched ray casts
+against one shared AABB tree, and the final few with FixUndercuts.find.
+"""
+
+import bpy
+import math
+from bpy.types import Operator
+from bpy.props import FloatProperty, IntProperty, EnumProperty, BoolProperty
+from typing import NamedTuple
+
+from .meshlib_utils import get_meshlib
+from .blender_meshlib_utils import blender_to_meshlib_via_stl
+from .support_tools import compute_up_vector, cast_parallel_rays
+
+
+class OrientationScore(NamedTuple):
+    axis: tuple            # horizontal tilt axis passed to compute_up_vector
+    angle: float           # tilt from +Z toward axis, degrees
+    up: tuple              # resulting up direction
+    undercut_area: float   # mm², from FixUndercuts.find
+    added_volume: float    # mm³ of material a fill along -up would add (sampled)
+
+
+def candidate_orientations(angle_step: float = 10.0):
+    """
+    Evenly spread up directions as (axis, angle) pairs for compute_up_vector.
+
+    Tilts run from 0° (Z up) to 180° (Z down); each ring gets a number of
+    azimuths proportional to its circumference.
+    """
+    step = max(1.0, float(angle_step))
+    n_rings = int(round(180.0 / step))
+    candidates = []
+    for r in range(n_rings + 1):
+        angle = 180.0 * r / n_rings
+        n_az = max(1, int(round(360.0 / step * math.sin(math.radians(angle)))))
+        for k in range(n_az):
+            phi = 2.0 * math.pi * k / n_az
+            axis = (math.cos(phi), math.sin(phi), 0.0)
+            up = compute_up_vector(axis, angle)
+            candidates.append((axis, angle, (up.x, up.y, up.z)))
+    return candidates
+
+
+def face_samples(mesh, max_samples: int = 100_000):
+    """
+    Face centroids, unit normals and area weights as numpy arrays.
+
+    Degenerate faces are dropped. Above max_samples faces a random subset is
+    used, with weights scaled so sums still estimate whole-mesh totals.
+    """
+    import numpy as np
+    from .meshlib_utils import get_mrmeshnumpy
+    mn = get_mrmeshnumpy()
+
+    pts = np.asarray(mn.toNumpyArray(mesh.points), dtype=np.float64)
+    faces = mn.getNumpyFaces(mesh.topology)
+    a, b, c = pts[faces[:, 0]], pts[faces[:, 1]], pts[faces[:, 2]]
+    cross = np.cross(b - a, c - a)
+    norm = np.linalg.norm(cross, axis=1)
+    keep = norm > 0.0
+    centroids = ((a + b + c) / 3.0)[keep]
+    normals = cross[keep] / norm[keep, None]
+    weights = 0.5 * norm[keep]
+
+    if len(weights) > max_samples:
+        rng = np.random.default_rng(0)
+        pick = rng.choice(len(weights), size=max_samples, replace=False)
+        scale = len(weights) / max_samples
+        centroids, normals, weights = centroids[pick], normals[pick], weights[pick] * scale
+    return centroids, normals, weights, pts
+
+
+def normal_classification(samples, ups, max_elements: int = 16_000_000):
+    """
+    Occlusion-free scores for many up directions at once (numpy only).
+
+    Returns:
+        tuple: (down-facing area per up, free-fall volume per up). The
+        volume drops every down-facing face to the lowest point, an upper
+        bound on what Fix Undercuts adds.
+    """
+    import numpy as np
+    centroids, normals, weights, pts = samples
+    ups = np.asarray(ups, dtype=np.float64)
+    areas = np.empty(len(ups))
+    volumes = np.empty(len(ups))
+    chunk = max(1, max_elements // max(len(pts), len(weights), 1))
+    for i in range(0, len(ups), chunk):
+        u = ups[i:i + chunk].T
+        bottom = (pts @ u).min(axis=0)
+        d = normals @ u
+        down = d < 0.0
+        areas[i:i + chunk] = weights @ down
+        volumes[i:i + chunk] = weights @ (np.where(down, -d, 0.0) * (centroids @ u - bottom))
+    return areas, volumes
+
+
+def score_orientation(mesh, samples, up, eps: float):
+    """
+    Sampled undercut area and added volume for one up direction.
+
+    A face is an undercut when it faces down or something above it blocks
+    the view along up. Every down-facing face adds the column between it
+    and the next surface below (or the lowest point) along -up.
+
+    Returns:
+        tuple: (undercut_area, added_volume)
+    """
+    import numpy as np
+    centroids, normals, weights, pts = samples
+    u = np.asarray(up, dtype=np.float64)
+    d = normals @ u
+    down = d < 0.0
+    bottom = float((pts @ u).min())
+
+    up_facing = ~down
+    shadowed = np.zeros(len(d), dtype=bool)
+    if up_facing.any():
+        shadowed[up_facing] = cast_parallel_rays(mesh, centroids[up_facing] + eps * u, u, hits_only=True)
+    undercut_area = float(weights[down | shadowed].sum())
+
+    added_volume = 0.0
+    if down.any():
+        origins = centroids[down]
+        gap = cast_parallel_rays(mesh, origins - eps * u, -u).astype(np.float64) + eps
+        free_fall = origins @ u - bottom
+        gap = np.where(np.isnan(gap), free_fall, np.minimum(gap, free_fall))
+        added_volume = float((weights[down] * -d[down] * gap).sum())
+    return undercut_area, added_volume
+
+
+def exact_undercut_area(mesh, up) -> float:
+    mm, _ = get_meshlib()
+    params = mm.FixUndercuts.FindParams()
+    params.upDirection = mm.Vector3f(*up)
+    undercuts = mm.FaceBitSet()
+    return float(mm.FixUndercuts.find(mesh, params, undercuts, mm.FixUndercuts.getUndercutAreaMetric(mesh)))
+
+
+def analyze_orientations(mesh, angle_step: float = 10.0, rank_by: str = "VOLUME", n_refine: int = 24,
+                         n_best: int = 5, max_samples: int = 100_000, n_workers: int = 4):
+    """
+    Rank candidate print orientations of mesh, best first.
+
+    Every candidate is classified from face normals alone (down-facing area
+    or free-fall volume, following rank_by); the n_refine lowest get
+    ray-cast undercut area and added volume, and the n_best of those
+    (by rank_by, 'VOLUME' or 'AREA') get an exact FixUndercuts.find area.
+
+    Returns:
+        list of OrientationScore, best first (n_best entries)
+    """
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+
+    candidates = candidate_orientations(angle_step)
+    samples = face_samples(mesh, max_samples)
+    box = mesh.computeBoundingBox()
+    eps = 1e-4 * max(box.diagonal(), 1e-6)
+
+    # ── Phase 1: Face-normal classification of every candidate (numpy) ──
+    areas, volumes = normal_classification(samples, [c[2] for c in candidates])
+    prefilter = volumes if rank_by == "VOLUME" else areas
+    shortlist = [candidates[i] for i in np.argsort(prefilter, kind="stable")[:max(n_refine, n_best)]]
+
+    # ── Phase 2: Ray-cast scoring of the shortlist (parallel, shared AABB tree) ──
+    mesh.getAABBTree()
+    with ThreadPoolExecutor(max_workers=max(1, min(len(shortlist), n_workers))) as executor:
+        scored = list(executor.map(lambda c: score_orientation(mesh, samples, c[2], eps), shortlist))
+
+    key_index = 1 if rank_by == "VOLUME" else 0
+    order = sorted(range(len(shortlist)), key=lambda i: (scored[i][key_index], scored[i][1 - key_index]))
+    best = order[:n_best]
+
+    # ── Phase 3: Exact undercut area for the winners (parallel) ──
+    with ThreadPoolExecutor(max_workers=max(1, min(len(best), n_workers))) as executor:
+        exact = list(executor.map(lambda i: exact_undercut_area(mesh, shortlist[i][2]), best))
+
+    return [OrientationScore(shortlist[i][0], shortlist[i][1], shortlist[i][2], area, scored[i][1])
+            for i, area in zip(best, exact)]
+
+
+class QUICKINFILL_OT_analyze_orientation(Operator):
+    bl_idname = "quick_infill.analyze_orientation"
+    bl_label = "Analyze Orientation"
+    bl_description = "Rank print orientations of the active mesh by undercut area and added support volume"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    angle_step: FloatProperty(  # type: ignore
+        name="Angle Step",
+        description="Spacing of candidate up directions (smaller = more candidates)",
+        default=10.0,
+        min=2.0,
+        max=45.0,
+        precision=1,
+    )
+    best_count: IntProperty(  # type: ignore
+        name="Results",
+        description="Number of best orientations to report",
+        default=5,
+        min=1,
+        max=20,
+    )
+    rank_by: EnumProperty(  # type: ignore
+        name="Rank By",
+        items=[
+            ("VOLUME", "Added Volume", "Least material added by undercut filling"),
+            ("AREA", "Undercut Area", "Least undercut surface area"),
+        ],
+        default="VOLUME",
+    )
+    apply_best: BoolProperty(  # type: ignore
+        name="Apply Best",
+        description="Rotate the object about its origin so the best up direction points along +Z",
+        default=False,
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        try:
+            get_meshlib()
+            selected_objs = [obj for obj in context.selected_objects if obj.type == 'MESH']
+            if not selected_objs:
+                self.report({'ERROR'}, "No mesh selected.")
+                return {'CANCELLED'}
+            obj = context.active_object if context.active_object in selected_objs else selected_objs[0]
+
+            # ── Phase 1: Export (Blender API) ──
+            mesh = blender_to_meshlib_via_stl(obj)
+
+            # ── Phase 2: Search (pure meshlib/numpy) ──
+            results = analyze_orientations(mesh, self.angle_step, self.rank_by, n_best=self.best_count)
+            if not results:
+                self.report({'ERROR'}, "No orientation could be scored.")
+                return {'CANCELLED'}
+
+            # ── Phase 3: Report and optionally apply (Blender API) ──
+            print(f"[Quick Infill] Print orientations for '{obj.name}' (best first):")
+            print(f"    {'tilt':>6} {'toward':>15} {'up':>24} {'undercut mm²':>13} {'added mm³':>11}")
+            for r in results:
+                print(f"    {r.angle:5.1f}° ({r.axis[0]:6.3f}, {r.axis[1]:6.3f}) "
+                      f"({r.up[0]:6.3f}, {r.up[1]:6.3f}, {r.up[2]:6.3f}) "
+                      f"{r.undercut_area:13.2f} {r.added_volume:11.2f}")
+
+            best = results[0]
+            if self.apply_best:
+                import mathutils
+                rot = mathutils.Vector(best.up).rotation_difference(mathutils.Vector((0.0, 0.0, 1.0)))
+                loc = obj.matrix_world.to_translation()
+                obj.matrix_world = (mathutils.Matrix.Translation(loc) @ rot.to_matrix().to_4x4()
+                                    @ mathutils.Matrix.Translation(-loc) @ obj.matrix_world)
+
+            self.report({'INFO'}, f"Best: tilt {best.angle:.1f}°, {best.undercut_area:.1f} mm² undercut, "
+                                  f"{best.added_volume:.1f} mm³ added (see console)")
+            return {'FINISHED'}
+
+        except Exception as e:
+            self.report({'ERROR'}, f"Orientation analysis failed: {e}")
+            print(f"[Quick Infill] Orientation analysis error: {e}")
+            return {'CANCELLED'}
+
+
+def register():
+    bpy.utils.register_class(QUICKINFILL_OT_analyze_orientation)
+
+
+def unregister():
+    bpy.utils.unregister_class(QUICKINFILL_OT_analyze_orientation)
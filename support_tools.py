@@ -8,8 +8,11 @@ import math
 import mathutils
 from bpy.types import Operator, PropertyGroup
 from bpy.props import FloatProperty, BoolProperty, EnumProperty
+from typing import NamedTuple
 from .meshlib_utils import get_meshlib
 from .blender_meshlib_utils import process_mesh_operation, blender_to_meshlib_via_stl, meshlib_to_blender_via_stl, select_results
+from .offset_utils import invalidate_mesh_stats, mesh_content_hash
+from .undercut_engine import LRUCache
 
 
 class QuickInfillSupportSettings(PropertyGroup):
@@ -84,6 +87,22 @@ class QuickInfillSupportSettings(PropertyGroup):
         default=False,
     )
     
+    undercut_engine: EnumProperty(
+        name="Engine",
+        description="How multi-direction undercut fills are computed",
+        items=[
+            ("SHARED_GRID", "Shared Grid", "Voxelize the source once and sweep every direction over the shared grid; faster for many directions, but the whole surface is re-extracted at voxel resolution (falls back to Per Direction for very large grids or with Auto Shrink)"),
+            ("PER_DIRECTION", "Per Direction", "Run MeshLib FixUndercuts separately for every direction"),
+        ],
+        default="PER_DIRECTION",
+    )
+    
+    split_components: BoolProperty(
+        name="Per Part",
+        description="Fix separate parts of a mesh apart and concurrently, each in its own grid; fills still reach the lowest point of the whole mesh, and parts whose fills could meet stay together",
+        default=False,
+    )
+    
     replace_original: BoolProperty(
         name="Replace Original",
         description="Replace the original object with the result instead of creating a new object",
@@ -160,6 +179,15 @@ def compute_up_vector(horizontal_axis: tuple, angle_degrees: float):
     return mm.Vector3f(x, y, z)
 
 
+# Every direction the 3x3 grid can select (Z last)
+_DIAG = 0.7071067811865476
+ALL_DIRECTIONS = (
+    (1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0),
+    (_DIAG, _DIAG, 0), (_DIAG, -_DIAG, 0), (-_DIAG, _DIAG, 0), (-_DIAG, -_DIAG, 0),
+    (0, 0, 1),
+)
+
+
 def get_selected_directions(settings) -> list:
     """Get list of selected horizontal direction tuples (normalized).
     
@@ -284,45 +312,37 @@ def shrink_top_faces_along_normals(mesh, up_vector, shrink_amount, angle_thresho
     if top_faces.count() == 0:
         return mesh
     
-    # Get vertex normals
-    vert_normals = mm.computePerVertNormals(mesh)
+    import numpy as np
+    from .meshlib_utils import get_mrmeshnumpy
+    mn = get_mrmeshnumpy()
+    
+    # Bulk arrays: points, vertex normals and the top-vertex mask
+    points = np.array(mn.toNumpyArray(mesh.points), dtype=np.float32)
+    normals = np.asarray(mn.toNumpyArray(mm.computePerVertNormals(mesh)), dtype=np.float32)
+    top_verts = mm.getIncidentVerts(mesh.topology, top_faces)
+    candidates = np.zeros(len(points), dtype=bool)
+    bits = mn.getNumpyBitSet(top_verts)[:len(points)]
+    candidates[:len(bits)] = bits
     
     # Compute threshold: cos(angle_threshold) - normals must have dot product >= this with up_vector
+    # Dot product with up_vector: 1.0 = pointing straight up, 0.0 = horizontal
     cos_threshold = math.cos(math.radians(angle_threshold))
+    up = np.array([up_vector.x, up_vector.y, up_vector.z], dtype=np.float32)
+    move = candidates & (normals @ up >= cos_threshold)
+    shrunk_count = int(move.sum())
     
-    # Get the points buffer for modification
-    points = mesh.points
-    
-    # Get vertices belonging to top faces
-    top_verts = mm.getIncidentVerts(mesh.topology, top_faces)
-    
-    # Move each top vertex inward along its normal, but only if it's nearly horizontal
-    shrunk_count = 0
-    for vid in range(mesh.topology.numValidVerts()):
-        vert_id = mm.VertId(vid)
-        if top_verts.test(vert_id):
-            normal = vert_normals[vert_id]
-            
-            # Check if this vertex's normal is within the angle threshold of pointing "up"
-            # Dot product with up_vector: 1.0 = pointing straight up, 0.0 = horizontal
-            dot = normal.x * up_vector.x + normal.y * up_vector.y + normal.z * up_vector.z
-            
-            if dot >= cos_threshold:
-                # Move inward (opposite to normal direction)
-                old_pos = points[vert_id]
-                new_pos = mm.Vector3f(
-                    old_pos.x - normal.x * shrink_amount,
-                    old_pos.y - normal.y * shrink_amount,
-                    old_pos.z - normal.z * shrink_amount
-                )
-                points[vert_id] = new_pos
-                shrunk_count += 1
+    # Move inward (opposite to normal direction)
+    if shrunk_count:
+        points[move] -= normals[move] * np.float32(shrink_amount)
+        mesh.points = mn.fromNumpyArray(points)
+        mesh.invalidateCaches()
+        invalidate_mesh_stats(mesh)
     
     print(f"[Quick Infill] Shrunk {shrunk_count} vertices (of {top_verts.count()} candidates) within {angle_threshold}° of horizontal by {shrink_amount}mm")
     return mesh
 
 
-def fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount=0.0, shrink_angle=30.0):
+def fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount=0.0, shrink_angle=30.0, in_place=True, ground_points=None):
     """Run undercut fix for a single direction, returns (result_mesh, undercut_count).
     
     Args:
@@ -331,18 +351,38 @@ def fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount=0.0,
         voxel_size: Voxel size for the fix operation
         shrink_amount: If > 0, shrink top-facing vertices by this amount after fixing
         shrink_angle: Angle threshold for shrinking (degrees from straight up)
+        in_place: If False, mesh is left untouched (it may be shared between
+            threads); a copy is made only when there is something to change,
+            otherwise mesh itself is returned
+        ground_points: Points (numpy array) of the whole model when mesh is
+            one part of it; the fill then reaches down to their lowest point
+            instead of stopping below the part's own
     """
     mm, _ = get_meshlib()
     
     params = mm.FixUndercuts.FixParams()
     params.findParameters.upDirection = up_vector
     params.voxelSize = voxel_size
+    if ground_points is not None:
+        import numpy as np
+        from .meshlib_utils import get_mrmeshnumpy
+        up = np.array([up_vector.x, up_vector.y, up_vector.z], dtype=np.float64)
+        up /= np.linalg.norm(up)
+        pts = np.asarray(get_mrmeshnumpy().toNumpyArray(mesh.points), dtype=np.float64)
+        drop = float((pts @ up).min() - (ground_points @ up).min())
+        if drop > 0.0:
+            # Same base below the common floor as the part would get below its own
+            from .undercut_engine import bottom_extension_for
+            params.bottomExtension = bottom_extension_for(drop, voxel_size)
     
     # Find undercuts
     undercuts = mm.FaceBitSet()
     mm.FixUndercuts.find(mesh, params.findParameters, undercuts)
     undercut_count = undercuts.count()
     
+    if not in_place and (undercut_count > 0 or shrink_amount > 0):
+        mesh = mm.copyMesh(mesh)
+    
     if undercut_count > 0:
         mm.FixUndercuts.fix(mesh, params)
     
@@ -361,6 +401,102 @@ def intersect_meshes(mesh_a, mesh_b, voxel_size):
     return mm.voxelBooleanIntersect(mesh_a, mesh_b, voxel_size)
 
 
+def overlap_box(boxes):
+    """
+    Intersection of axis-aligned boxes given as (min, max) xyz tuples.
+
+    Returns:
+        (min, max) tuple, or None if the boxes do not all overlap
+    """
+    lo = tuple(max(b[0][a] for b in boxes) for a in range(3))
+    hi = tuple(min(b[1][a] for b in boxes) for a in range(3))
+    if any(lo[a] > hi[a] for a in range(3)):
+        return None
+    return lo, hi
+
+
+def mesh_box(mesh):
+    box = mesh.computeBoundingBox()
+    return (box.min.x, box.min.y, box.min.z), (box.max.x, box.max.y, box.max.z)
+
+
+def crop_mesh_to_box(mesh, lo, hi):
+    """
+    Cut a closed mesh down to the axis-aligned box (lo, hi) with a mesh boolean.
+
+    Returns the mesh unchanged when the box already contains it or the
+    boolean fails (open or self-intersecting input), so callers can always
+    voxelize the result.
+    """
+    mm, _ = get_meshlib()
+    m_lo, m_hi = mesh_box(mesh)
+    if all(lo[a] <= m_lo[a] and m_hi[a] <= hi[a] for a in range(3)):
+        return mesh
+    box = mm.makeCube(mm.Vector3f(*(hi[a] - lo[a] for a in range(3))), mm.Vector3f(*lo))
+    try:
+        res = mm.boolean(mesh, box, mm.BooleanOperation.Intersection)
+    except Exception:
+        return mesh
+    if not res.valid() or res.mesh.topology.numValidFaces() == 0:
+        return mesh
+    return res.mesh
+
+
+def cropped_intersect_meshes(mesh_a, mesh_b, voxel_size):
+    """
+    Voxel intersection of two meshes that only voxelizes their overlap.
+
+    The result can only lie inside the intersection of the two bounding
+    boxes, so both operands are cropped to that box (plus a two voxel
+    margin, which keeps the cut faces outside the result) before
+    voxelizing. Returns an empty mesh when the boxes do not overlap.
+    """
+    mm, _ = get_meshlib()
+
+    overlap = overlap_box([mesh_box(mesh_a), mesh_box(mesh_b)])
+    if overlap is None:
+        return mm.Mesh()
+
+    pad = 2.0 * float(voxel_size)
+    lo = tuple(overlap[0][a] - pad for a in range(3))
+    hi = tuple(overlap[1][a] + pad for a in range(3))
+    return intersect_meshes(crop_mesh_to_box(mesh_a, lo, hi), crop_mesh_to_box(mesh_b, lo, hi), voxel_size)
+
+
+def intersect_many(meshes, voxel_size, max_workers=4):
+    """
+    Intersect a list of meshes with a balanced pairwise tree reduction.
+
+    Every mesh is first cropped to the overlap of all bounding boxes (the
+    result cannot extend past it). Pairs on each level then run in
+    parallel, so n meshes take about log2(n) rounds instead of n - 1
+    sequential steps, and every step only voxelizes the overlap of its two
+    operands. Returns an empty mesh as soon as the boxes or any step do
+    not overlap.
+    """
+    mm, _ = get_meshlib()
+    from concurrent.futures import ThreadPoolExecutor
+
+    overlap = overlap_box([mesh_box(m) for m in meshes])
+    if overlap is None:
+        return mm.Mesh()
+    pad = 2.0 * float(voxel_size)
+    lo = tuple(overlap[0][a] - pad for a in range(3))
+    hi = tuple(overlap[1][a] + pad for a in range(3))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(meshes), max_workers))) as executor:
+        level = list(executor.map(lambda m: crop_mesh_to_box(m, lo, hi), meshes))
+        while len(level) > 1:
+            pairs = [(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            carry = [level[-1]] if len(level) % 2 else []
+            results = list(executor.map(lambda p: cropped_intersect_meshes(p[0], p[1], voxel_size), pairs))
+            if any(r.topology.numValidVerts() == 0 for r in results):
+                return mm.Mesh()
+            # Odd one out goes first so it is paired early on the next level
+            level = carry + results
+    return level[0]
+
+
 def union_meshes(mesh_a, mesh_b, voxel_size):
     """Perform voxel-based boolean union of two meshlib meshes."""
     mm, _ = get_meshlib()
@@ -368,7 +504,401 @@ def union_meshes(mesh_a, mesh_b, voxel_size):
     return mm.voxelBooleanUnite(mesh_a, mesh_b, voxel_size)
 
 
-def fix_undercuts_single_mesh(mesh, directions, angle, voxel_size, shrink_amount, shrink_angle):
+class ClipVolume(NamedTuple):
+    """A clipping shape prepared once and shared by every part it clips."""
+    mesh: object
+    level_set: object
+    box: tuple      # (min, max) xyz
+    tri_lo: object  # per-triangle bounding boxes (numpy, n x 3)
+    tri_hi: object
+
+
+def prepare_clip_volume(clip_mesh, voxel_size):
+    """Voxelize the clipping shape once and index its triangle bounds."""
+    import numpy as np
+    from .meshlib_utils import get_mrmeshnumpy
+    mn = get_mrmeshnumpy()
+
+    pts = np.asarray(mn.toNumpyArray(clip_mesh.points), dtype=np.float64)
+    tris = pts[mn.getNumpyFaces(clip_mesh.topology)]
+    return ClipVolume(clip_mesh, mesh_level_set(clip_mesh, voxel_size), mesh_box(clip_mesh),
+                      tris.min(axis=1), tris.max(axis=1))
+
+
+def classify_against_clip(part_box, clip):
+    """
+    Bounding-box test of a part against a clip volume.
+
+    Returns "OUTSIDE" when the boxes do not overlap, "INSIDE" when no clip
+    triangle touches the part's box and its centre lies inside the clip
+    (so the whole part does), else "CROSSING".
+    """
+    import numpy as np
+    mm, _ = get_meshlib()
+
+    if overlap_box([part_box, clip.box]) is None:
+        return "OUTSIDE"
+    lo = np.asarray(part_box[0])
+    hi = np.asarray(part_box[1])
+    touching = np.all(clip.tri_lo <= hi, axis=1) & np.all(clip.tri_hi >= lo, axis=1)
+    if touching.any():
+        return "CROSSING"
+    centre = (lo + hi) * 0.5
+    inside = clip.mesh.signedDistance(mm.Vector3f(*centre)) < 0.0
+    return "INSIDE" if inside else "OUTSIDE"
+
+
+def clip_to_volume(mesh, clip, voxel_size):
+    """
+    Intersect mesh with a prepared clip volume.
+
+    Only the part is voxelized; the clip level set is copied, not rebuilt.
+    The part is cropped to the clip's box first, as in cropped_intersect_meshes.
+    """
+    mm, _ = get_meshlib()
+    pad = 2.0 * float(voxel_size)
+    lo = tuple(clip.box[0][a] - pad for a in range(3))
+    hi = tuple(clip.box[1][a] + pad for a in range(3))
+    grid = mesh_level_set(crop_mesh_to_box(mesh, lo, hi), voxel_size)
+    grid *= mm.FloatGrid.deepCopy(clip.level_set)
+    return level_set_to_mesh(grid, voxel_size)
+
+
+def direction_workers(n_directions, object_workers=1):
+    """
+    Thread count for per-direction undercut jobs inside one object.
+
+    MeshLib already spreads each voxelization over cores, so the direction
+    pool only takes the share of cores the object-level pool leaves free.
+    """
+    import os
+    cores = os.cpu_count() or 4
+    share = cores // max(1, int(object_workers)) // 2
+    return max(1, min(int(n_directions), share))
+
+
+# Per-direction FixUndercuts results from recent runs (see fix_directions_shared)
+DIRECTION_CACHE_SIZE = 32
+DIRECTION_CACHE_BYTES = 512 * 1024 * 1024
+_direction_cache = LRUCache(DIRECTION_CACHE_SIZE, max_bytes=DIRECTION_CACHE_BYTES)
+
+
+@bpy.app.handlers.persistent
+def clear_undercut_caches(*_args):
+    """Release cached fills and direction results (new file, add-on unload)."""
+    from .undercut_engine import clear_caches
+    _direction_cache.clear()
+    clear_caches()
+
+
+class DirectionResult:
+    """Cached outcome of one direction; mesh None means the source was unchanged."""
+
+    __slots__ = ("mesh", "undercuts", "level_set", "cache_key")
+
+    def __init__(self, mesh, undercuts, level_set=None, cache_key=None):
+        self.mesh = mesh
+        self.undercuts = undercuts
+        self.level_set = level_set
+        self.cache_key = cache_key
+
+
+def direction_cache_key(mesh_hash, up_vector, voxel_size, shrink_amount, shrink_angle):
+    shrink = (round(float(shrink_amount), 6), round(float(shrink_angle), 4)) if shrink_amount > 0 else None
+    up = (round(float(up_vector.x), 6), round(float(up_vector.y), 6), round(float(up_vector.z), 6))
+    return (mesh_hash, up, round(float(voxel_size), 6), shrink)
+
+
+def fix_directions_shared(mesh, up_vectors, voxel_size, shrink_amount, shrink_angle, max_workers=1, mesh_hash=None,
+                          ground_points=None):
+    """
+    Fix undercuts for each up vector against one shared, unmodified source mesh.
+
+    Runs in a pool of at most max_workers threads. Directions without
+    undercuts (and no shrink) return the source itself instead of a copy.
+    With mesh_hash, results are looked up in and added to the in-session
+    direction cache, so only directions not computed before for this
+    geometry, voxel size and shrink setting are run. ground_points is
+    passed on to fix_undercuts_for_direction.
+
+    Returns:
+        tuple: (DirectionResult per up vector in order, total undercuts)
+    """
+    def _one(up_vector):
+        result, count = fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount, shrink_angle,
+                                                    in_place=False, ground_points=ground_points)
+        return DirectionResult(None if result is mesh else result, count)
+
+    keys = [direction_cache_key(mesh_hash, u, voxel_size, shrink_amount, shrink_angle) for u in up_vectors] if mesh_hash else None
+    entries = [_direction_cache.get(k) for k in keys] if keys else [None] * len(up_vectors)
+    missing = [i for i, e in enumerate(entries) if e is None]
+
+    if max_workers <= 1 or len(missing) <= 1:
+        computed = [_one(up_vectors[i]) for i in missing]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(int(max_workers), len(missing))) as executor:
+            computed = list(executor.map(lambda i: _one(up_vectors[i]), missing))
+    for i, entry in zip(missing, computed):
+        entries[i] = entry
+        if keys:
+            entry.cache_key = keys[i]
+            _direction_cache.put(keys[i], entry)
+    return entries, sum(e.undercuts for e in entries)
+
+
+def mesh_level_set(mesh, voxel_size):
+    """Voxelize a closed meshlib mesh into a narrow-band level-set grid."""
+    mm, _ = get_meshlib()
+    vs = float(voxel_size)
+    return mm.meshToLevelSet(mm.MeshPart(mesh), mm.AffineXf3f(), mm.Vector3f(vs, vs, vs), 3.0)
+
+
+def level_set_to_mesh(grid, voxel_size):
+    """Extract the zero iso-surface of a level-set grid built by mesh_level_set."""
+    mm, _ = get_meshlib()
+    vs = float(voxel_size)
+    settings = mm.GridToMeshSettings()
+    settings.voxelSize = mm.Vector3f(vs, vs, vs)
+    settings.isoValue = 0.0
+    return mm.gridToMesh(grid, settings)
+
+
+def combine_direction_results(results, use_union_combine, voxel_size, max_workers=1, level_sets=None):
+    """
+    Combine per-direction results with union (negative angle) or intersect.
+
+    Every distinct result is voxelized once (in parallel), the grids are
+    folded into one with a running min (union) or max (intersect), and the
+    surface is extracted once at the end. Directions that returned the
+    shared source unchanged are only voxelized once, since union and
+    intersection are idempotent. level_sets, if given, maps id(result) to
+    an already voxelized grid; grids computed here are added to it, and
+    grids from it are never modified.
+    """
+    unique = list({id(r): r for r in results}.values())
+    if len(unique) == 1:
+        return unique[0]
+
+    level_sets = {} if level_sets is None else level_sets
+    todo = [r for r in unique if id(r) not in level_sets]
+    if max_workers <= 1 or len(todo) <= 1:
+        grids = [mesh_level_set(r, voxel_size) for r in todo]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(int(max_workers), len(todo))) as executor:
+            grids = list(executor.map(lambda r: mesh_level_set(r, voxel_size), todo))
+    for r, grid in zip(todo, grids):
+        level_sets[id(r)] = grid
+
+    # The CSG operators consume their right-hand grid, so fold copies
+    mm, _ = get_meshlib()
+    acc = mm.FloatGrid.deepCopy(level_sets[id(unique[0])])
+    for r in unique[1:]:
+        if use_union_combine:
+            acc += mm.FloatGrid.deepCopy(level_sets[id(r)])
+        else:
+            acc *= mm.FloatGrid.deepCopy(level_sets[id(r)])
+    return level_set_to_mesh(acc, voxel_size)
+
+
+def combine_direction_entries(mesh, entries, use_union_combine, voxel_size, max_workers=1):
+    """
+    combine_direction_results for DirectionResult entries of source mesh.
+
+    Level sets already stored on the entries are reused, and new ones are
+    stored back, so a later run with other directions or the other
+    combine mode only voxelizes what it has not seen.
+
+    The result is always a new mesh: when a single entry (or the source)
+    is all that is left, a copy is returned, so callers may modify it
+    without touching the cache or the shared source.
+    """
+    mm, _ = get_meshlib()
+    results = [mesh if e.mesh is None else e.mesh for e in entries]
+    level_sets = {id(r): e.level_set for r, e in zip(results, entries) if e.level_set is not None}
+    combined = combine_direction_results(results, use_union_combine, voxel_size, max_workers, level_sets)
+    for r, e in zip(results, entries):
+        grid = level_sets.get(id(r))
+        if grid is not None and e.level_set is None:
+            e.level_set = grid
+            if e.cache_key is not None:
+                # Re-put so the byte budget counts the new level set
+                _direction_cache.put(e.cache_key, e)
+    if any(combined is r for r in results):
+        combined = mm.copyMesh(combined)
+    return combined
+
+
+def cast_parallel_rays(mesh, origins, direction, hits_only=False):
+    """
+    Cast one ray per origin, all along direction, in a single batched call.
+
+    direction may also be an array with one direction per origin. Uses the
+    mesh's cached AABB tree, so concurrent calls on one mesh share it.
+    Returns hit distances (NaN where nothing is hit), or a bool hit mask
+    with hits_only.
+    """
+    import numpy as np
+    from .meshlib_utils import get_mrmeshnumpy
+    mm, _ = get_meshlib()
+    mn = get_mrmeshnumpy()
+
+    n = len(origins)
+    dirs = np.broadcast_to(np.asarray(direction, dtype=np.float32), (n, 3))
+    result = mm.MultiRayMeshIntersectResult()
+    if hits_only:
+        hits = mm.BitSet()
+        result.intersectingRays = hits
+    else:
+        distances = mm.std_vector_float()
+        result.rayDistances = distances
+    mm.multiRayMeshIntersect(mm.MeshPart(mesh), mn.fromNumpyArray(np.ascontiguousarray(origins, dtype=np.float32)),
+                             mn.fromNumpyArray(np.ascontiguousarray(dirs)), result)
+    if hits_only:
+        mask = np.zeros(n, dtype=bool)
+        bits = mn.getNumpyBitSet(hits)[:n]
+        mask[:len(bits)] = bits
+        return mask
+    return np.fromiter(distances, dtype=np.float32, count=distances.size())
+
+
+def vertex_thickness(mesh, max_workers=4, chunk_size=200_000):
+    """
+    Local wall thickness at every vertex, from an inward ray along -normal.
+
+    Rays go out in chunks from a thread pool against the mesh's shared AABB
+    tree. Vertices whose ray escapes (open meshes) get inf.
+
+    Returns:
+        numpy float array indexed by VertId (length vertSize)
+    """
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+    from .meshlib_utils import get_mrmeshnumpy
+    mm, _ = get_meshlib()
+    mn = get_mrmeshnumpy()
+
+    pts = np.asarray(mn.toNumpyArray(mesh.points), dtype=np.float32)
+    normals = np.asarray(mn.toNumpyArray(mm.computePerVertNormals(mesh)), dtype=np.float32)
+    box = mesh.computeBoundingBox()
+    eps = 1e-4 * max(box.diagonal(), 1e-6)
+    origins = pts - eps * normals
+
+    mesh.getAABBTree()
+    chunks = [slice(i, min(i + chunk_size, len(pts))) for i in range(0, len(pts), chunk_size)]
+    with ThreadPoolExecutor(max_workers=max(1, min(len(chunks), max_workers))) as executor:
+        parts = list(executor.map(lambda c: cast_parallel_rays(mesh, origins[c], -normals[c]), chunks))
+    thickness = (np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)).astype(np.float64) + eps
+    thickness[np.isnan(thickness)] = np.inf
+    return thickness
+
+
+def undercut_face_mask(mesh, up_vectors, use_union_combine, max_workers=4):
+    """
+    Undercut faces for several up vectors, combined into one face mask.
+
+    Uses FixUndercuts.find's classification without voxelizing anything: a
+    face is an undercut when it faces away from up, or when a ray from its
+    centre along up hits the mesh. All rays of a direction go out in one
+    batched call against the shared AABB tree, and directions run in
+    parallel. Directions combine like Fix Undercuts does: in intersect
+    mode a face counts only if it is an undercut from every direction, in
+    union mode if it is one from any direction.
+
+    Returns:
+        numpy bool array indexed by FaceId (length faceSize)
+    """
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+    from .meshlib_utils import get_mrmeshnumpy
+    mn = get_mrmeshnumpy()
+
+    pts = np.asarray(mn.toNumpyArray(mesh.points), dtype=np.float64)
+    faces = mn.getNumpyFaces(mesh.topology)
+    a, b, c = pts[faces[:, 0]], pts[faces[:, 1]], pts[faces[:, 2]]
+    normals = np.cross(b - a, c - a)
+    centres = (a + b + c) / 3.0
+    valid = np.any(faces != faces[:, :1], axis=1)
+    del a, b, c
+    eps = 1e-4 * max(float(mesh.computeBoundingBox().diagonal()), 1e-6)
+
+    def _mask(up_vector):
+        u = np.array([up_vector.x, up_vector.y, up_vector.z], dtype=np.float64)
+        u /= np.linalg.norm(u)
+        mask = normals @ u < 0.0
+        facing_up = np.flatnonzero(~mask & valid)
+        mask[facing_up] = cast_parallel_rays(mesh, centres[facing_up] + eps * u, u, hits_only=True)
+        return mask & valid
+
+    mesh.getAABBTree()
+    with ThreadPoolExecutor(max_workers=max(1, min(len(up_vectors), int(max_workers)))) as executor:
+        masks = list(executor.map(_mask, up_vectors))
+    combine = np.logical_or if use_union_combine else np.logical_and
+    return combine.reduce(masks) if len(masks) > 1 else masks[0]
+
+
+def z_after_ground(ground_points, up_vectors, z_up, voxel_size):
+    """
+    Ground points for the union-mode Z pass on one part of a model.
+
+    Adds how far the whole model's tilted fills (along up_vectors) reach
+    below it, since the Z pass runs on their combined result.
+    """
+    import numpy as np
+    from .undercut_engine import BOTTOM_EXTENSION_VOXELS, swept_floor_points
+
+    def _np(v):
+        a = np.array([v.x, v.y, v.z], dtype=np.float64)
+        return a / np.linalg.norm(a)
+
+    ups = [_np(u) for u in up_vectors]
+    bottoms = [float((ground_points @ u).min()) - BOTTOM_EXTENSION_VOXELS * float(voxel_size) for u in ups]
+    return np.vstack([ground_points, swept_floor_points(ground_points, ups, bottoms, _np(z_up))])
+
+
+def fix_undercuts_per_part(mesh, fix_fn, up_vectors, voxel_size, max_workers=4):
+    """
+    Fix undercuts on each separate part of mesh concurrently and join the results.
+
+    fix_fn(part, ground_points) fixes one part and returns (mesh, undercut
+    count); ground_points holds the whole model's points so every part's
+    fill still reaches the common floor, or is None when the mesh does not
+    split. Parts are grouped so no group's fill (its shadow down every
+    up vector) can reach another group.
+
+    Returns:
+        tuple: (processed_mesh, total_undercuts)
+    """
+    import numpy as np
+    from .meshlib_utils import get_mrmeshnumpy
+    from .offset_utils import COMPONENT_GAP_VOXELS, process_components
+    from .undercut_engine import BOTTOM_EXTENSION_VOXELS, shadow_box
+
+    vs = float(voxel_size)
+    ground = np.asarray(get_mrmeshnumpy().toNumpyArray(mesh.points), dtype=np.float64)
+    ups = [np.array([u.x, u.y, u.z], dtype=np.float64) for u in up_vectors]
+    ups = [u / np.linalg.norm(u) for u in ups]
+    bottoms = [float((ground @ u).min()) - BOTTOM_EXTENSION_VOXELS * vs for u in ups]
+    pad = (BOTTOM_EXTENSION_VOXELS + COMPONENT_GAP_VOXELS) * vs
+
+    def _envelope(lo, hi):
+        lo, hi = shadow_box(lo, hi, ups, bottoms)
+        return lo - pad, hi + pad
+
+    counts = []
+
+    def _fix(part):
+        result, count = fix_fn(part, None if part is mesh else ground)
+        counts.append(count)
+        return result
+
+    joined = process_components(mesh, _fix, _envelope, max_workers)
+    return joined, sum(counts)
+
+
+def fix_undercuts_single_mesh(mesh, directions, angle, voxel_size, shrink_amount, shrink_angle, max_workers=1, engine="PER_DIRECTION", use_cache=True,
+                              per_part=False, ground_points=None):
     """
     Process undercut fixing for a single meshlib mesh.
     
@@ -379,6 +909,15 @@ def fix_undercuts_single_mesh(mesh, directions, angle, voxel_size, shrink_amount
         voxel_size: Voxel size for fixing
         shrink_amount: Amount to shrink top faces (0 = disabled)
         shrink_angle: Angle threshold for shrinking
+        max_workers: Threads for the per-direction jobs (see direction_workers)
+        engine: "SHARED_GRID" to use undercut_engine for multi-direction runs
+            without shrink; falls back to per-direction when the grid is too big
+        use_cache: Reuse per-direction results from earlier runs on the same
+            geometry (multi-direction runs only)
+        per_part: Fix separate parts apart and concurrently (see
+            fix_undercuts_per_part)
+        ground_points: Floor for the fills when mesh is one part of a model
+            (see fix_undercuts_for_direction)
     
     Returns:
         tuple: (processed_mesh, total_undercuts)
@@ -389,11 +928,22 @@ def fix_undercuts_single_mesh(mesh, directions, angle, voxel_size, shrink_amount
     abs_angle = abs(float(angle))
     use_union_combine = float(angle) < 0.0
     only_z_direction = len(directions) == 1 and directions[0] == (0, 0, 1)
+
+    def _up(d):
+        return mm.Vector3f(0, 0, 1) if d == (0, 0, 1) else compute_up_vector(d, abs_angle)
+
+    if per_part:
+        def _fix_part(part, ground):
+            return fix_undercuts_single_mesh(part, directions, angle, voxel_size, shrink_amount, shrink_angle,
+                                             max_workers, engine, use_cache and ground is None, ground_points=ground)
+        ups = [mm.Vector3f(0, 0, 1)] if abs_angle == 0 or only_z_direction else [_up(d) for d in directions]
+        return fix_undercuts_per_part(mesh, _fix_part, ups, voxel_size)
     
     if abs_angle == 0 or only_z_direction:
         # Pure Z-up mode (no horizontal tilt)
         up_vector = mm.Vector3f(0, 0, 1)
-        mesh, undercut_count = fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount, shrink_angle)
+        mesh, undercut_count = fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount, shrink_angle,
+                                                           ground_points=ground_points)
         total_undercuts = undercut_count
     else:
         # In union mode (negative angle), Z is applied as a post-process on the
@@ -402,47 +952,39 @@ def fix_undercuts_single_mesh(mesh, directions, angle, voxel_size, shrink_amount
         apply_z_after = use_union_combine and has_z
         process_dirs = [d for d in directions if d != (0, 0, 1)] if apply_z_after else directions
 
-        # Process each direction, then combine with voxel intersect (positive angle)
-        # or voxel union (negative angle).
-        results = []
-        for horiz_dir in process_dirs:
-            if horiz_dir == (0, 0, 1):
-                # Z direction = pure Z-up
-                mesh_copy = mm.copyMesh(mesh)
-                up_vector = mm.Vector3f(0, 0, 1)
-                result_mesh, undercut_count = fix_undercuts_for_direction(mesh_copy, up_vector, voxel_size, shrink_amount, shrink_angle)
-                results.append(result_mesh)
-                total_undercuts += undercut_count
-                continue
-            
-            # Make a copy of the mesh for each direction
-            mesh_copy = mm.copyMesh(mesh)
-            up_vector = compute_up_vector(horiz_dir, abs_angle)
-            result_mesh, undercut_count = fix_undercuts_for_direction(mesh_copy, up_vector, voxel_size, shrink_amount, shrink_angle)
-            results.append(result_mesh)
-            total_undercuts += undercut_count
-        
-        # Combine all results together.
-        if len(results) == 1:
-            mesh = results[0]
-        else:
-            mesh = results[0]
-            for i in range(1, len(results)):
-                if use_union_combine:
-                    mesh = union_meshes(mesh, results[i], voxel_size)
-                else:
-                    mesh = intersect_meshes(mesh, results[i], voxel_size)
+        # Process each direction against the shared source in a bounded pool,
+        # then combine in a single level-set grid: intersect (positive angle)
+        # or union (negative angle).
+        up_vectors = [_up(d) for d in process_dirs]
+        mesh_hash = mesh_content_hash(mesh) if use_cache else None
+        if engine == "SHARED_GRID" and shrink_amount <= 0 and len(up_vectors) > 1:
+            from .undercut_engine import fix_undercuts_shared_grid
+            shared = fix_undercuts_shared_grid(
+                mesh, up_vectors, voxel_size, use_union_combine,
+                z_after_up=mm.Vector3f(0, 0, 1) if apply_z_after else None,
+                layout_ups=[_up(d) for d in ALL_DIRECTIONS] if use_cache else None,
+                mesh_hash=mesh_hash, ground_points=ground_points,
+            )
+            if shared is not None:
+                return shared
+        entries, total_undercuts = fix_directions_shared(
+            mesh, up_vectors, voxel_size, shrink_amount, shrink_angle, max_workers, mesh_hash, ground_points
+        )
+        mesh = combine_direction_entries(mesh, entries, use_union_combine, voxel_size, max_workers)
 
         # In union mode, apply Z fix on the merged result instead of the original.
         if apply_z_after:
             up_vector = mm.Vector3f(0, 0, 1)
-            mesh, undercut_count = fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount, shrink_angle)
+            z_ground = None if ground_points is None else z_after_ground(ground_points, up_vectors, up_vector, voxel_size)
+            mesh, undercut_count = fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount, shrink_angle,
+                                                               in_place=False, ground_points=z_ground)
             total_undercuts += undercut_count
     
     return mesh, total_undercuts
 
 
-def fix_undercuts_from_view_single_mesh(mesh, directions, angle, voxel_size, shrink_amount, shrink_angle, view_rotation):
+def fix_undercuts_from_view_single_mesh(mesh, directions, angle, voxel_size, shrink_amount, shrink_angle, view_rotation, max_workers=1, engine="PER_DIRECTION", use_cache=True,
+                                        per_part=False, ground_points=None):
     """
     Process undercut fixing from view for a single meshlib mesh.
     
@@ -454,6 +996,15 @@ def fix_undercuts_from_view_single_mesh(mesh, directions, angle, voxel_size, shr
         shrink_amount: Amount to shrink top faces (0 = disabled)
         shrink_angle: Angle threshold for shrinking
         view_rotation: Blender quaternion for camera rotation
+        max_workers: Threads for the per-direction jobs (see direction_workers)
+        engine: "SHARED_GRID" to use undercut_engine for multi-direction runs
+            without shrink; falls back to per-direction when the grid is too big
+        use_cache: Reuse per-direction results from earlier runs on the same
+            geometry (multi-direction runs only)
+        per_part: Fix separate parts apart and concurrently (see
+            fix_undercuts_per_part)
+        ground_points: Floor for the fills when mesh is one part of a model
+            (see fix_undercuts_for_direction)
     
     Returns:
         tuple: (processed_mesh, total_undercuts)
@@ -465,12 +1016,26 @@ def fix_undercuts_from_view_single_mesh(mesh, directions, angle, voxel_size, shr
     use_union_combine = float(angle) < 0.0
     only_z_direction = len(directions) == 1 and directions[0] == (0, 0, 1)
     
+    if per_part:
+        def _fix_part(part, ground):
+            return fix_undercuts_from_view_single_mesh(part, directions, angle, voxel_size, shrink_amount, shrink_angle,
+                                                       view_rotation, max_workers, engine, use_cache and ground is None,
+                                                       ground_points=ground)
+        camera_forward = view_rotation @ mathutils.Vector((0, 0, 1))
+        camera_forward.normalize()
+        ups = [mm.Vector3f(camera_forward.x, camera_forward.y, camera_forward.z)]
+        if not (only_z_direction or abs_angle == 0):
+            # Union mode also sweeps the combined result along the camera axis
+            ups += [compute_view_space_up_vector(d, view_rotation, abs_angle) for d in directions]
+        return fix_undercuts_per_part(mesh, _fix_part, ups, voxel_size)
+
     if only_z_direction or abs_angle == 0:
         # Pure camera direction (no tilt)
         camera_forward = view_rotation @ mathutils.Vector((0, 0, 1))
         camera_forward.normalize()
         up_vector = mm.Vector3f(camera_forward.x, camera_forward.y, camera_forward.z)
-        mesh, undercut_count = fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount, shrink_angle)
+        mesh, undercut_count = fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount, shrink_angle,
+                                                           ground_points=ground_points)
         total_undercuts = undercut_count
     else:
         # In union mode (negative angle), Z is applied as a post-process on the
@@ -479,33 +1044,38 @@ def fix_undercuts_from_view_single_mesh(mesh, directions, angle, voxel_size, shr
         apply_z_after = use_union_combine and has_z
         process_dirs = [d for d in directions if d != (0, 0, 1)] if apply_z_after else directions
 
-        # Process each direction in view space, then combine with voxel intersect
-        # (positive angle) or voxel union (negative angle).
-        results = []
-        for screen_dir in process_dirs:
-            mesh_copy = mm.copyMesh(mesh)
-            up_vector = compute_view_space_up_vector(screen_dir, view_rotation, abs_angle)
-            result_mesh, undercut_count = fix_undercuts_for_direction(mesh_copy, up_vector, voxel_size, shrink_amount, shrink_angle)
-            results.append(result_mesh)
-            total_undercuts += undercut_count
-        
-        # Combine all results together.
-        if len(results) == 1:
-            mesh = results[0]
-        else:
-            mesh = results[0]
-            for i in range(1, len(results)):
-                if use_union_combine:
-                    mesh = union_meshes(mesh, results[i], voxel_size)
-                else:
-                    mesh = intersect_meshes(mesh, results[i], voxel_size)
+        # Process each direction in view space against the shared source in a
+        # bounded pool, then combine in a single level-set grid: intersect
+        # (positive angle) or union (negative angle).
+        up_vectors = [compute_view_space_up_vector(d, view_rotation, abs_angle) for d in process_dirs]
+        mesh_hash = mesh_content_hash(mesh) if use_cache else None
+        if engine == "SHARED_GRID" and shrink_amount <= 0 and len(up_vectors) > 1:
+            from .undercut_engine import fix_undercuts_shared_grid
+            z_after_up = None
+            if apply_z_after:
+                camera_forward = view_rotation @ mathutils.Vector((0, 0, 1))
+                camera_forward.normalize()
+                z_after_up = mm.Vector3f(camera_forward.x, camera_forward.y, camera_forward.z)
+            layout_ups = None
+            if use_cache:
+                layout_ups = [compute_view_space_up_vector(d, view_rotation, abs_angle) for d in ALL_DIRECTIONS]
+            shared = fix_undercuts_shared_grid(mesh, up_vectors, voxel_size, use_union_combine, z_after_up=z_after_up,
+                                               layout_ups=layout_ups, mesh_hash=mesh_hash, ground_points=ground_points)
+            if shared is not None:
+                return shared
+        entries, total_undercuts = fix_directions_shared(
+            mesh, up_vectors, voxel_size, shrink_amount, shrink_angle, max_workers, mesh_hash, ground_points
+        )
+        mesh = combine_direction_entries(mesh, entries, use_union_combine, voxel_size, max_workers)
 
         # In union mode, apply Z fix on the merged result instead of the original.
         if apply_z_after:
             camera_forward = view_rotation @ mathutils.Vector((0, 0, 1))
             camera_forward.normalize()
             up_vector = mm.Vector3f(camera_forward.x, camera_forward.y, camera_forward.z)
-            mesh, undercut_count = fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount, shrink_angle)
+            z_ground = None if ground_points is None else z_after_ground(ground_points, up_vectors, up_vector, voxel_size)
+            mesh, undercut_count = fix_undercuts_for_direction(mesh, up_vector, voxel_size, shrink_amount, shrink_angle,
+                                                               in_place=False, ground_points=z_ground)
             total_undercuts += undercut_count
     
     return mesh, total_undercuts
@@ -538,6 +1108,8 @@ class QUICKINFILL_OT_fix_undercuts(Operator):
 
             shrink_amount = float(settings.shrink_amount) if auto_shrink else 0.0
             shrink_angle = float(settings.shrink_angle_threshold) if auto_shrink else 30.0
+            engine = getattr(settings, 'undercut_engine', 'PER_DIRECTION')
+            split_components = getattr(settings, 'split_components', False)
 
             from .offset_utils import decimate_mesh, should_auto_decimate_faces
             from .blender_meshlib_utils import replace_mesh_keep_transforms
@@ -567,7 +1139,8 @@ class QUICKINFILL_OT_fix_undercuts(Operator):
                     raise RuntimeError("failed to load mesh")
                 mesh, initial_faces, initial_verts = entry
                 result_mesh, undercut_count = fix_undercuts_single_mesh(
-                    mesh, directions, angle, voxel_size, shrink_amount, shrink_angle
+                    mesh, directions, angle, voxel_size, shrink_amount, shrink_angle, dir_workers, engine,
+                    per_part=split_components,
                 )
                 if auto_decimate:
                     current_faces = result_mesh.topology.numValidFaces()
@@ -577,6 +1150,7 @@ class QUICKINFILL_OT_fix_undercuts(Operator):
                 return i, result_mesh, initial_verts, result_mesh.topology.numValidVerts(), undercut_count
 
             n_workers = min(len(selected_objs), 4)
+            dir_workers = direction_workers(len(directions), n_workers)
             success_map = {}
             error_map = {}
             with ThreadPoolExecutor(max_workers=n_workers) as executor:
@@ -719,6 +1293,8 @@ class QUICKINFILL_OT_fix_undercuts_from_view(Operator):
 
             shrink_amount = float(settings.shrink_amount) if auto_shrink else 0.0
             shrink_angle = float(settings.shrink_angle_threshold) if auto_shrink else 70.0
+            engine = getattr(settings, 'undercut_engine', 'PER_DIRECTION')
+            split_components = getattr(settings, 'split_components', False)
 
             from .offset_utils import decimate_mesh, should_auto_decimate_faces
             from .blender_meshlib_utils import replace_mesh_keep_transforms
@@ -748,7 +1324,8 @@ class QUICKINFILL_OT_fix_undercuts_from_view(Operator):
                     raise RuntimeError("failed to load mesh")
                 mesh, initial_faces, initial_verts = entry
                 result_mesh, undercut_count = fix_undercuts_from_view_single_mesh(
-                    mesh, directions, angle, voxel_size, shrink_amount, shrink_angle, view_rotation
+                    mesh, directions, angle, voxel_size, shrink_amount, shrink_angle, view_rotation, dir_workers, engine,
+                    per_part=split_components,
                 )
                 if auto_decimate:
                     current_faces = result_mesh.topology.numValidFaces()
@@ -758,6 +1335,7 @@ class QUICKINFILL_OT_fix_undercuts_from_view(Operator):
                 return i, result_mesh, initial_verts, result_mesh.topology.numValidVerts(), undercut_count
 
             n_workers = min(len(selected_objs), 4)
+            dir_workers = direction_workers(len(directions), n_workers)
             success_map = {}
             error_map = {}
             with ThreadPoolExecutor(max_workers=n_workers) as executor:
@@ -861,6 +1439,130 @@ class QUICKINFILL_OT_fix_undercuts_from_view(Operator):
             return {'CANCELLED'}
 
 
+# Face attributes written by Show Undercuts
+UNDERCUT_ATTR = "quick_infill_undercut"
+UNDERCUT_COLOR_ATTR = "QI Undercuts"
+
+
+class QUICKINFILL_OT_show_undercuts(Operator):
+    bl_idname = "quick_infill.show_undercuts"
+    bl_label = "Show Undercuts"
+    bl_description = "Mark undercut faces for the selected directions as a face attribute on the selected mesh(es), without changing geometry"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    clear: BoolProperty(  # type: ignore
+        name="Clear",
+        description="Remove the undercut attributes instead of computing them",
+        default=False,
+        options={'SKIP_SAVE'},
+    )
+
+    def execute(self, context):
+        try:
+            import numpy as np
+            mm, _ = get_meshlib()
+            settings = context.scene.quick_infill_support_settings
+            angle = float(settings.undercut_angle)
+
+            selected_objs = [obj for obj in context.selected_objects if obj.type == 'MESH']
+            if not selected_objs:
+                self.report({'ERROR'}, "No mesh selected.")
+                return {'CANCELLED'}
+            if any(obj.mode == 'EDIT' for obj in selected_objs):
+                self.report({'ERROR'}, "Switch to Object Mode first.")
+                return {'CANCELLED'}
+
+            if self.clear:
+                for obj in selected_objs:
+                    for name in (UNDERCUT_ATTR, UNDERCUT_COLOR_ATTR):
+                        attr = obj.data.attributes.get(name)
+                        if attr is not None:
+                            obj.data.attributes.remove(attr)
+                    obj.data.update()
+                self.report({'INFO'}, f"Cleared undercut overlay on {len(selected_objs)} object(s)")
+                return {'FINISHED'}
+
+            directions = get_selected_directions(settings)
+            if not directions:
+                directions = [(0, 0, 1)]
+            abs_angle = abs(angle)
+            if abs_angle == 0 or directions == [(0, 0, 1)]:
+                up_vectors = [mm.Vector3f(0, 0, 1)]
+            else:
+                up_vectors = [mm.Vector3f(0, 0, 1) if d == (0, 0, 1) else compute_up_vector(d, abs_angle)
+                              for d in directions]
+
+            from .blender_meshlib_utils import blender_to_meshlib_triangles
+
+            total_faces = 0
+            for obj in selected_objs:
+                # ── Read mesh data directly (no STL round trip, no modifiers) ──
+                mesh, tri_polygons = blender_to_meshlib_triangles(obj)
+
+                # ── find() per direction in parallel, no voxelization ──
+                face_mask = undercut_face_mask(mesh, up_vectors, angle < 0.0)
+                tri_mask = np.zeros(len(tri_polygons), dtype=bool)
+                n = min(len(tri_mask), len(face_mask))
+                tri_mask[:n] = face_mask[:n]
+
+                # ── Write back with bulk foreach_set ──
+                mesh_data = obj.data
+                poly_mask = np.zeros(len(mesh_data.polygons), dtype=bool)
+                poly_mask[tri_polygons[tri_mask]] = True
+                total_faces += int(poly_mask.sum())
+
+                attr = mesh_data.attributes.get(UNDERCUT_ATTR)
+                if attr is None or attr.domain != 'FACE' or attr.data_type != 'BOOLEAN':
+                    if attr is not None:
+                        mesh_data.attributes.remove(attr)
+                    attr = mesh_data.attributes.new(UNDERCUT_ATTR, 'BOOLEAN', 'FACE')
+                attr.data.foreach_set("value", poly_mask)
+
+                # Color attributes only live on points or corners: spread the
+                # face mask over each polygon's loops
+                n_polys = len(mesh_data.polygons)
+                loop_start = np.empty(n_polys, dtype=np.int32)
+                loop_total = np.empty(n_polys, dtype=np.int32)
+                mesh_data.polygons.foreach_get("loop_start", loop_start)
+                mesh_data.polygons.foreach_get("loop_total", loop_total)
+                offsets = np.arange(int(loop_total.sum())) - np.repeat(np.cumsum(loop_total) - loop_total, loop_total)
+                loop_mask = np.zeros(len(mesh_data.loops), dtype=bool)
+                loop_mask[np.repeat(loop_start, loop_total) + offsets] = np.repeat(poly_mask, loop_total)
+
+                colors = np.where(loop_mask[:, None], (1.0, 0.1, 0.05, 1.0), (0.8, 0.8, 0.8, 1.0)).astype(np.float32)
+                color_attr = mesh_data.color_attributes.get(UNDERCUT_COLOR_ATTR)
+                if color_attr is None or color_attr.domain != 'CORNER' or color_attr.data_type != 'FLOAT_COLOR':
+                    if color_attr is not None:
+                        mesh_data.color_attributes.remove(color_attr)
+                    color_attr = mesh_data.color_attributes.new(UNDERCUT_COLOR_ATTR, 'FLOAT_COLOR', 'CORNER')
+                color_attr.data.foreach_set("color", colors.ravel())
+                mesh_data.color_attributes.active_color = color_attr
+                mesh_data.update()
+
+            # Show the overlay if the viewport is in solid mode
+            space = context.space_data
+            if space is not None and space.type == 'VIEW_3D' and space.shading.type == 'SOLID':
+                space.shading.color_type = 'ATTRIBUTE'
+
+            self.report({'INFO'}, f"Marked {total_faces} undercut faces from {len(up_vectors)} direction(s)")
+            return {'FINISHED'}
+
+        except Exception as e:
+            self.report({'ERROR'}, f"Show Undercuts failed: {e}")
+            import traceback
+            traceback.print_exc()
+            return {'CANCELLED'}
+
+
+def world_bounds(obj, context):
+    """World-space (min, max) of an object's evaluated bounding box."""
+    evaluated = obj.evaluated_get(context.evaluated_depsgraph_get())
+    corners = [evaluated.matrix_world @ mathutils.Vector(c) for c in evaluated.bound_box]
+    lo = tuple(min(c[a] for c in corners) for a in range(3))
+    hi = tuple(max(c[a] for c in corners) for a in range(3))
+    return lo, hi
+
+
 class QUICKINFILL_OT_voxel_intersect(Operator):
     """Intersect all selected mesh objects using voxel boolean"""
     bl_idname = "quick_infill.voxel_intersect"
@@ -888,19 +1590,19 @@ class QUICKINFILL_OT_voxel_intersect(Operator):
             
             # Use active object or first selected as starting point
             active_obj = context.active_object if context.active_object in selected_meshes else selected_meshes[0]
+            ordered = [active_obj] + [obj for obj in selected_meshes if obj != active_obj]
+            mesh_names = [obj.name for obj in ordered]
             
-            # Convert first mesh to meshlib
-            result_mesh = blender_to_meshlib_via_stl(active_obj)
-            mesh_names = [active_obj.name]
+            # Bail out before converting anything if the world bounds do not all overlap
+            if overlap_box([world_bounds(obj, context) for obj in ordered]) is None:
+                self.report({'ERROR'}, "Intersection resulted in empty mesh. Objects may not overlap.")
+                return {'CANCELLED'}
             
-            # Iteratively intersect with remaining meshes
-            for obj in selected_meshes:
-                if obj == active_obj:
-                    continue
-                
-                other_mesh = blender_to_meshlib_via_stl(obj)
-                result_mesh = intersect_meshes(result_mesh, other_mesh, voxel_size)
-                mesh_names.append(obj.name)
+            # Convert all meshes (loads overlap the exports), then reduce pairwise in parallel
+            from .blender_meshlib_utils import blender_objects_to_meshlib
+            meshes = blender_objects_to_meshlib(ordered)
+            result_mesh = intersect_many(meshes, voxel_size)
+            del meshes
             
             # Check if result is valid
             if result_mesh.topology.numValidVerts() == 0:
@@ -936,6 +1638,84 @@ class QUICKINFILL_OT_voxel_intersect(Operator):
             return {'CANCELLED'}
 
 
+class QUICKINFILL_OT_clip_to_volume(Operator):
+    """Clip every selected mesh to the active object's volume"""
+    bl_idname = "quick_infill.clip_to_volume"
+    bl_label = "Clip to Volume"
+    bl_description = "Intersect each selected mesh with the active object (e.g. a build volume or tile box). The active object is voxelized only once"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        selected_meshes = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        return len(selected_meshes) >= 2 and context.active_object in selected_meshes
+    
+    def execute(self, context):
+        try:
+            get_meshlib()
+            settings = context.scene.quick_infill_support_settings
+            voxel_size = float(settings.voxel_size)
+            replace_original = settings.replace_original
+            
+            selected_meshes = [obj for obj in context.selected_objects if obj.type == 'MESH']
+            clip_obj = context.active_object
+            parts = [obj for obj in selected_meshes if obj != clip_obj]
+            if clip_obj not in selected_meshes or not parts:
+                self.report({'ERROR'}, "Select the parts, then the clipping object last (active).")
+                return {'CANCELLED'}
+            
+            from .blender_meshlib_utils import blender_objects_to_meshlib, replace_mesh_keep_transforms
+            from concurrent.futures import ThreadPoolExecutor
+            
+            # ── Phase 1: Convert clip shape and parts (loads overlap the exports) ──
+            meshes = blender_objects_to_meshlib([clip_obj] + parts)
+            clip = prepare_clip_volume(meshes[0], voxel_size)
+            part_meshes = meshes[1:]
+            del meshes
+            
+            # ── Phase 2: Skip parts fully inside/outside, clip the rest in parallel ──
+            status = [classify_against_clip(mesh_box(m), clip) for m in part_meshes]
+            crossing = [i for i, st in enumerate(status) if st == "CROSSING"]
+            clipped = {}
+            if crossing:
+                with ThreadPoolExecutor(max_workers=min(len(crossing), 4)) as executor:
+                    for i, result in zip(crossing, executor.map(lambda i: clip_to_volume(part_meshes[i], clip, voxel_size), crossing)):
+                        clipped[i] = result
+            
+            # ── Phase 3: Import results (Blender API, sequential) ──
+            result_objs = []
+            emptied = 0
+            for i, result_mesh in clipped.items():
+                if result_mesh.topology.numValidVerts() == 0:
+                    emptied += 1
+                    continue
+                part = parts[i]
+                result_obj = meshlib_to_blender_via_stl(result_mesh, name=part.name + "_Clipped")
+                if replace_original:
+                    result_obj = replace_mesh_keep_transforms(part, result_obj)
+                result_objs.append(result_obj)
+            
+            inside = status.count("INSIDE")
+            outside = status.count("OUTSIDE") + emptied
+            print(f"[Quick Infill] Clip to Volume '{clip_obj.name}': {len(result_objs)} clipped, "
+                  f"{inside} fully inside, {outside} outside")
+            for part, st in zip(parts, status):
+                if st != "CROSSING":
+                    print(f"    '{part.name}': {st.lower()}, skipped")
+            
+            if result_objs:
+                select_results(result_objs)
+            self.report({'INFO'}, f"Clipped {len(result_objs)} object(s); {inside} inside and {outside} outside left unchanged")
+            return {'FINISHED'}
+            
+        except Exception as e:
+            self.report({'ERROR'}, f"Clip to Volume failed: {e}")
+            print(f"[Quick Infill] Clip to Volume error: {e}")
+            import traceback
+            traceback.print_exc()
+            return {'CANCELLED'}
+
+
 class QUICKINFILL_OT_shrink_from_view(Operator):
     """Shrink top-facing faces based on the current viewport direction"""
     bl_idname = "quick_infill.shrink_from_view"
@@ -974,29 +1754,23 @@ class QUICKINFILL_OT_shrink_from_view(Operator):
             
             print(f"[Quick Infill] Shrink from View: up direction = ({view_dir.x:.3f}, {view_dir.y:.3f}, {view_dir.z:.3f})")
 
-            # Process all selected objects
-            results = []
-            
-            for src_obj in selected_objs:
-                mesh = blender_to_meshlib_via_stl(src_obj)
-                initial_verts = mesh.topology.numValidVerts()
-                
-                # Shrink top faces
-                mesh = shrink_top_faces_along_normals(mesh, up_vector, shrink_amount, shrink_angle)
-                
-                final_verts = mesh.topology.numValidVerts()
-                
-                # Convert back to Blender
-                new_name = src_obj.name + "_Shrunk"
-                result_obj = meshlib_to_blender_via_stl(mesh, name=new_name)
-                
-                # Handle transforms
-                if replace_original:
-                    from .blender_meshlib_utils import replace_mesh_keep_transforms
-                    result_obj = replace_mesh_keep_transforms(src_obj, result_obj)
-                
-                results.append((result_obj, initial_verts, final_verts))
-                print(f"[Quick Infill] Shrink from View ({src_obj.name}): {initial_verts} → {final_verts} vertices")
+            # Export, shrink and re-import every selected object through the
+            # shared batch pipeline (worker pool, overlapped export/process/save)
+            from .blender_meshlib_utils import batch_process_mesh_operation
+
+            def _shrink(mesh):
+                return shrink_top_faces_along_normals(mesh, up_vector, shrink_amount, shrink_angle)
+
+            results, failed = batch_process_mesh_operation(
+                selected_objs, _shrink, "_Shrunk", replace_original=replace_original
+            )
+            for result_obj, initial_verts, final_verts in results:
+                print(f"[Quick Infill] Shrink from View ({result_obj.name}): {initial_verts} → {final_verts} vertices")
+            for src_obj, exc in failed:
+                print(f"[Quick Infill] Shrink from View failed for '{src_obj.name}': {exc}")
+            if not results:
+                self.report({'ERROR'}, "Shrink from View failed for all selected objects (see console).")
+                return {'CANCELLED'}
             
             # Report results
             obj_count = len(results)
@@ -1087,6 +1861,8 @@ def draw_support_tools(layout, context):
         # Angle slider (degrees, shown without subtype conversion)
         angle_row = tools_col.row(align=True)
         angle_row.prop(settings, "undercut_angle", text="Angle")
+        tools_col.prop(settings, "undercut_engine", text="Engine")
+        tools_col.prop(settings, "split_components", text="Per Part")
         
         # Voxel size slider
         prop_with_suffix(tools_col, settings, "voxel_size", "Voxel Size", "mm")
@@ -1097,6 +1873,10 @@ def draw_support_tools(layout, context):
         row = tools_col.row(align=True)
         row.operator("quick_infill.fix_undercuts", text="Fix Undercuts", icon='MOD_SMOOTH')
         row.operator("quick_infill.fix_undercuts_from_view", text="From View", icon='HIDE_OFF')
+        row = tools_col.row(align=True)
+        row.operator("quick_infill.show_undercuts", text="Show Undercuts", icon='SHADING_TEXTURE')
+        row.operator("quick_infill.show_undercuts", text="", icon='X').clear = True
+        tools_col.operator("quick_infill.analyze_orientation", text="Analyze Orientation", icon='ORIENTATION_GIMBAL')
         
         tools_col.separator()
         
@@ -1116,13 +1896,16 @@ def draw_support_tools(layout, context):
         row = tools_col.row(align=True)
         row.operator("quick_infill.voxel_intersect", text="Voxel Intersect", icon='MOD_BOOLEAN')
         row.prop(settings, "voxel_intersect_keep_original", text="Keep Original")
+        tools_col.operator("quick_infill.clip_to_volume", text="Clip to Active", icon='MOD_BOOLEAN')
 
 
 classes = (
     QuickInfillSupportSettings,
     QUICKINFILL_OT_fix_undercuts,
     QUICKINFILL_OT_fix_undercuts_from_view,
+    QUICKINFILL_OT_show_undercuts,
     QUICKINFILL_OT_voxel_intersect,
+    QUICKINFILL_OT_clip_to_volume,
     QUICKINFILL_OT_shrink_from_view,
 )
 
@@ -1134,6 +1917,8 @@ def register():
     bpy.types.Scene.quick_infill_support_settings = bpy.props.PointerProperty(
         type=QuickInfillSupportSettings
     )
+    if clear_undercut_caches not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(clear_undercut_caches)
 
 
 def unregister():
@@ -1145,3 +1930,7 @@ def unregister():
     
     if hasattr(bpy.types.Scene, 'quick_infill_support_settings'):
         del bpy.types.Scene.quick_infill_support_settings
+
+    if clear_undercut_caches in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_undercut_caches)
+    clear_undercut_caches()
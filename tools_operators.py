@@ -1,12 +1,21 @@
 """
 Tool operators for Quick Infill addon.
-Provides Grow, Shrink, Remesh, Trim Thin, and Trim Edges operations.
+Provides Grow, Shrink, Remesh, Trim Thin, Trim Edges and Make LODs operations.
 """
 
 import bpy
 from bpy.types import Operator
 from .meshlib_utils import get_meshlib
-from .offset_utils import cuda_offset, decimate_mesh, target_faces_for_density, should_auto_decimate_faces
+from .offset_utils import (
+    COMPONENT_GAP_VOXELS,
+    cuda_offset,
+    decimate_mesh,
+    mesh_stats,
+    padded_envelope,
+    process_components,
+    should_auto_decimate_faces,
+    target_faces_for_density,
+)
 from .blender_meshlib_utils import process_mesh_operation, batch_process_mesh_operation, blender_to_meshlib_via_stl, meshlib_to_blender_via_stl, select_results
 
 
@@ -15,6 +24,117 @@ class _MeshCollapsedError(Exception):
     pass
 
 
+# Above this share of thin vertices Trim Thin opens the whole mesh at once
+THIN_REGION_MAX_FRACTION = 0.5
+
+# Custom property caching inscribed-distance estimates on each object
+INSCRIBED_CACHE_KEY = "quick_infill_inscribed"
+
+
+def per_part(op, resolution: float, reach: float = 0.0, enabled: bool = True):
+    """
+    Wrap a mesh operation so each separate part of the mesh runs on its own.
+
+    reach is how far op can move the surface outward; parts closer than
+    that (plus a small gap) are kept together. Parts that collapse are
+    dropped from the result; _MeshCollapsedError is raised only when all do.
+    """
+    if not enabled:
+        return op
+    envelope = padded_envelope(max(0.0, float(reach)) + COMPONENT_GAP_VOXELS * float(resolution))
+
+    def _op(mesh):
+        return process_components(mesh, op, envelope, skip=(_MeshCollapsedError,))
+    return _op
+
+
+def _inscribed_entry_key(voxel_size: float, dilate: float) -> str:
+    return f"{float(voxel_size):.6g}:{float(dilate):.6g}"
+
+
+def cached_inscribed(obj, mesh_hash: str, entry_key: str):
+    """Return the cached (depth, error) for this mesh content and key, else None."""
+    data = obj.get(INSCRIBED_CACHE_KEY)
+    if data is None:
+        return None
+    try:
+        if data["hash"] != mesh_hash:
+            return None
+        entry = data["entries"].get(entry_key)
+        return None if entry is None else (float(entry[0]), float(entry[1]))
+    except (KeyError, TypeError, IndexError, AttributeError):
+        return None
+
+
+def store_inscribed(obj, mesh_hash: str, entry_key: str, depth: float, error: float):
+    """Cache an inscribed-distance estimate on the object, dropping entries for older content."""
+    data = obj.get(INSCRIBED_CACHE_KEY)
+    entries = {}
+    try:
+        if data is not None and data["hash"] == mesh_hash:
+            entries = {k: list(v) for k, v in data["entries"].items()}
+    except (KeyError, TypeError, AttributeError):
+        entries = {}
+    entries[entry_key] = [float(depth), float(error)]
+    obj[INSCRIBED_CACHE_KEY] = {"hash": mesh_hash, "entries": entries}
+
+
+def predict_collapses(blender_objs, voxel_size: float, shrink: float, dilate: float = 0.0, max_workers: int = 4):
+    """
+    Indices of blender_objs that shrinking by shrink (after growing by
+    dilate) is predicted to collapse.
+
+    Uses a coarse inscribed-distance estimate per object, cached on the object
+    with its content hash, so doomed objects can be skipped before any
+    full-resolution offset. The error bound is a heuristic, so callers leave
+    predicted objects untouched rather than deleting them. Objects with
+    active modifiers or shape keys are never predicted, since the estimate
+    reads the base mesh only.
+    """
+    from .offset_utils import mesh_content_hash
+    from .volume_utils import inscribed_depth
+    from .blender_meshlib_utils import blender_to_meshlib_triangles
+    from concurrent.futures import ThreadPoolExecutor
+
+    entry_key = _inscribed_entry_key(voxel_size, dilate)
+    estimates = {}   # i → (depth, error)
+    pending = {}     # i → (mesh, mesh_hash)
+
+    # ── Phase 1: Read meshes and cached estimates (Blender API, sequential) ──
+    for i, obj in enumerate(blender_objs):
+        if any(mod.show_viewport for mod in obj.modifiers) or obj.data.shape_keys is not None:
+            continue
+        try:
+            mesh, _ = blender_to_meshlib_triangles(obj)
+        except Exception:
+            continue
+        mesh_hash = mesh_content_hash(mesh)
+        cached = cached_inscribed(obj, mesh_hash, entry_key)
+        if cached is not None:
+            estimates[i] = cached
+        else:
+            pending[i] = (mesh, mesh_hash)
+
+    # ── Phase 2: Estimate the rest in parallel (pure meshlib) ──
+    if pending:
+        def _estimate(item):
+            i, (mesh, _) = item
+            try:
+                return i, inscribed_depth(mesh, voxel_size, dilate=dilate)
+            except Exception:
+                return i, None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(pending), max_workers))) as executor:
+            for i, estimate in executor.map(_estimate, pending.items()):
+                if estimate is None:
+                    continue
+                estimates[i] = estimate
+                # Results arrive on the calling thread, so the Blender write is safe
+                store_inscribed(blender_objs[i], pending[i][1], entry_key, *estimate)
+
+    return {i for i, (depth, error) in estimates.items() if depth + error < float(shrink)}
+
+
 class QUICKINFILL_OT_grow(Operator):
     bl_idname = "quick_infill.grow"
     bl_label = "Grow"
@@ -28,6 +148,7 @@ class QUICKINFILL_OT_grow(Operator):
             resolution = float(settings.voxel_size)
             auto_decimate = settings.auto_decimate
             replace_original = settings.replace_original
+            split_components = settings.split_components
 
             selected_objs = [obj for obj in bpy.context.selected_objects if obj.type == 'MESH']
             if not selected_objs:
@@ -37,6 +158,7 @@ class QUICKINFILL_OT_grow(Operator):
             # Grow = positive offset
             def grow_op(mesh):
                 return cuda_offset(mesh, resolution, distance)
+            grow_op = per_part(grow_op, resolution, distance, split_components)
             
             # Use batch processing for multiple objects, single processing for one
             if len(selected_objs) == 1:
@@ -85,6 +207,7 @@ class QUICKINFILL_OT_shrink(Operator):
             resolution = float(settings.voxel_size)
             auto_decimate = settings.auto_decimate
             replace_original = settings.replace_original
+            split_components = settings.split_components
 
             selected_objs = [obj for obj in bpy.context.selected_objects if obj.type == 'MESH']
             if not selected_objs:
@@ -94,6 +217,7 @@ class QUICKINFILL_OT_shrink(Operator):
             # Shrink = negative offset
             def shrink_op(mesh):
                 return cuda_offset(mesh, resolution, -distance)
+            shrink_op = per_part(shrink_op, resolution, enabled=split_components)
             
             # Use batch processing for multiple objects, single processing for one
             if len(selected_objs) == 1:
@@ -141,6 +265,7 @@ class QUICKINFILL_OT_remesh(Operator):
             resolution = float(settings.voxel_size)
             auto_decimate = settings.auto_decimate
             replace_original = settings.replace_original
+            split_components = settings.split_components
 
             selected_objs = [obj for obj in bpy.context.selected_objects if obj.type == 'MESH']
             if not selected_objs:
@@ -150,6 +275,7 @@ class QUICKINFILL_OT_remesh(Operator):
             # Remesh = offset with 0 distance (re-voxelizes)
             def remesh_op(mesh):
                 return cuda_offset(mesh, resolution, 0.0)
+            remesh_op = per_part(remesh_op, resolution, enabled=split_components)
             
             # Use batch processing for multiple objects, single processing for one
             if len(selected_objs) == 1:
@@ -197,24 +323,56 @@ class QUICKINFILL_OT_trim_thin(Operator):
             resolution = float(settings.voxel_size)
             auto_decimate = settings.auto_decimate
             replace_original = settings.replace_original
+            split_components = settings.split_components
 
             selected_objs = [obj for obj in bpy.context.selected_objects if obj.type == 'MESH']
             if not selected_objs:
                 self.report({'ERROR'}, "No mesh selected.")
                 return {'CANCELLED'}
 
+            from .support_tools import vertex_thickness
+            from .volume_utils import open_thin_regions
+            from .meshlib_utils import get_mrmeshnumpy
+
             # Trim thin = shrink then grow by resolution (removes thin features).
+            # A wall-thickness pass finds where that can change anything; when
+            # only part of the mesh is thin, the opening runs around those
+            # regions alone and the rest keeps its original triangles.
             # If the shrink collapses the mesh to nothing, raise _MeshCollapsedError
             # so batch_process_mesh_operation can skip it and return it as collapsed.
             def trim_thin_op(mesh):
+                import numpy as np
+                thin = vertex_thickness(mesh) < 2.0 * resolution
+                valid = np.asarray(get_mrmeshnumpy().getNumpyBitSet(mesh.topology.getValidVerts()), dtype=bool)
+                thin = thin[:len(valid)] & valid[:len(thin)]
+                if not thin.any():
+                    return mesh
+                if thin.sum() <= THIN_REGION_MAX_FRACTION * valid.sum():
+                    pts = get_mrmeshnumpy().toNumpyArray(mesh.points)[:len(thin)][thin]
+                    local = open_thin_regions(mesh, pts, resolution)
+                    if local is not None:
+                        if local.topology.numValidFaces() == 0:
+                            raise _MeshCollapsedError()
+                        return local
+
                 shrunk = cuda_offset(mesh, resolution, -resolution)
                 if shrunk.topology.numValidFaces() == 0:
                     raise _MeshCollapsedError()
                 return cuda_offset(shrunk, resolution, resolution)
+            trim_thin_op = per_part(trim_thin_op, resolution, enabled=split_components)
+
+            # Objects the shrink is predicted to collapse are skipped up front
+            # from a cheap coarse estimate instead of paying for the offset;
+            # the estimate is not exact, so they are left in place and reported
+            doomed = predict_collapses(selected_objs, resolution, resolution)
+            predicted_names = [obj.name for i, obj in enumerate(selected_objs) if i in doomed]
+            selected_objs = [obj for i, obj in enumerate(selected_objs) if i not in doomed]
 
             # Use batch processing for all objects. Collapsed meshes are returned
             # separately in the second element without aborting the batch.
-            if len(selected_objs) == 1:
+            if not selected_objs:
+                results, collapsed = [], []
+            elif len(selected_objs) == 1:
                 try:
                     result_obj, initial_verts, final_verts = process_mesh_operation(
                         selected_objs[0], trim_thin_op, "_TrimThin",
@@ -242,6 +400,9 @@ class QUICKINFILL_OT_trim_thin(Operator):
             if removed_names:
                 names_str = ", ".join(f"'{n}'" for n in removed_names)
                 self.report({'WARNING'}, f"Trim Thin: {len(removed_names)} object(s) fully removed (too thin for current resolution): {names_str}")
+            if predicted_names:
+                names_str = ", ".join(f"'{n}'" for n in predicted_names)
+                self.report({'WARNING'}, f"Trim Thin: {len(predicted_names)} object(s) skipped, predicted to collapse entirely (left unchanged): {names_str}")
 
             if results:
                 total_initial = sum(r[1] for r in results)
@@ -291,7 +452,15 @@ class QUICKINFILL_OT_trim_edges(Operator):
                 self.report({'ERROR'}, "No mesh selected.")
                 return {'CANCELLED'}
 
+            # Objects the -3x erosion is predicted to collapse are skipped
+            # before export from a cheap coarse estimate; they are left in
+            # place and reported rather than deleted
+            doomed = predict_collapses(selected_objs, resolution, 3.0 * distance, dilate=2.0 * distance)
+            predicted_names = [obj.name for i, obj in enumerate(selected_objs) if i in doomed]
+            selected_objs = [obj for i, obj in enumerate(selected_objs) if i not in doomed]
+
             from .support_tools import intersect_meshes
+            from .volume_utils import trim_edges_volume, trim_edges_grid, dense_voxel_count, MAX_DENSE_VOXELS
             from .blender_meshlib_utils import replace_mesh_keep_transforms
             from concurrent.futures import ThreadPoolExecutor, as_completed
             import os, tempfile
@@ -319,12 +488,7 @@ class QUICKINFILL_OT_trim_edges(Operator):
                     meshlib_meshes.append(None)
 
             # ── Phase 2: Process meshes in parallel (pure meshlib, no Blender API) ──
-            def _process_one(args):
-                i, entry = args
-                if entry is None:
-                    raise RuntimeError("failed to load mesh")
-                original_mesh, initial_faces, initial_verts = entry
-
+            def _trim_edges_by_offsets(original_mesh):
                 working_mesh = mm.copyMesh(original_mesh)
                 working_mesh = cuda_offset(working_mesh, resolution, 2.0 * distance)
                 working_mesh = cuda_offset(working_mesh, resolution, -3.0 * distance)
@@ -334,6 +498,7 @@ class QUICKINFILL_OT_trim_edges(Operator):
 
                 working_mesh = cuda_offset(working_mesh, resolution, (1.0 + trim_edges_x) * distance)
 
+                working_stats = mesh_stats(working_mesh)
                 target_faces = target_faces_for_density(
                     working_mesh,
                     faces_per_sq_unit=trim_edges_density,
@@ -342,8 +507,7 @@ class QUICKINFILL_OT_trim_edges(Operator):
                 )
                 current_faces = working_mesh.topology.numValidFaces()
                 if target_faces < current_faces:
-                    bbox = working_mesh.computeBoundingBox()
-                    diag = (bbox.max - bbox.min).length()
+                    diag = working_stats.diagonal
                     target_ratio = float(target_faces) / float(max(1, current_faces))
                     reduction_strength = max(0.0, 1.0 - target_ratio)
                     adaptive_max_error = max(
@@ -352,7 +516,23 @@ class QUICKINFILL_OT_trim_edges(Operator):
                     )
                     working_mesh = decimate_mesh(working_mesh, target_face_count=target_faces, max_error=adaptive_max_error)
 
-                result_mesh = intersect_meshes(working_mesh, original_mesh, resolution)
+                return intersect_meshes(working_mesh, original_mesh, resolution)
+
+            def _process_one(args):
+                i, entry = args
+                if entry is None:
+                    raise RuntimeError("failed to load mesh")
+                original_mesh, initial_faces, initial_verts = entry
+
+                # One dense distance-field pipeline; None means the grid would
+                # be too large, so fall back to the mesh offset sequence
+                result_mesh = trim_edges_volume(original_mesh, resolution, distance, trim_edges_x,
+                                                target_faces=initial_faces if auto_decimate else None)
+                if result_mesh is not None:
+                    if result_mesh.topology.numValidFaces() == 0:
+                        raise _MeshCollapsedError()
+                else:
+                    result_mesh = _trim_edges_by_offsets(original_mesh)
 
                 if auto_decimate:
                     final_faces_before = result_mesh.topology.numValidFaces()
@@ -362,11 +542,29 @@ class QUICKINFILL_OT_trim_edges(Operator):
 
                 return i, result_mesh, initial_verts, result_mesh.topology.numValidVerts()
 
-            n_workers = min(len(selected_objs), 4)
+            n_workers = max(1, min(len(selected_objs), 4))
+            # MAX_DENSE_VOXELS bounds the dense fields held at once, not per
+            # worker: only run as many workers as the largest grids fit in
+            # it together (grids over the limit take the offset fallback)
+            dense_sizes = []
+            for entry in meshlib_meshes:
+                if entry is None:
+                    continue
+                n = dense_voxel_count(trim_edges_grid(entry[0], resolution, distance)[1])
+                if n <= MAX_DENSE_VOXELS:
+                    dense_sizes.append(n)
+            dense_sizes.sort(reverse=True)
+            dense_workers = 0
+            held = 0
+            for n in dense_sizes[:n_workers]:
+                held += n
+                if held > MAX_DENSE_VOXELS:
+                    break
+                dense_workers += 1
             success_map = {}   # i → (result_mesh, initial_verts, final_verts)
             collapsed_map = {} # i → exception
 
-            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            with ThreadPoolExecutor(max_workers=dense_workers or n_workers) as executor:
                 futures = {executor.submit(_process_one, (i, meshlib_meshes[i])): i
                            for i in range(len(selected_objs))}
                 for future in as_completed(futures):
@@ -420,7 +618,7 @@ class QUICKINFILL_OT_trim_edges(Operator):
             # Pre-capture names before any removal so stale StructRNA is never accessed.
             collapsed_names = {i: selected_objs[i].name for i in collapsed_map}
             removed_names = []
-            for i, obj_name in collapsed_names.items():
+            for obj_name in collapsed_names.values():
                 removed_names.append(obj_name)
                 if obj_name in bpy.data.objects:
                     bpy.data.objects.remove(bpy.data.objects[obj_name], do_unlink=True)
@@ -448,6 +646,9 @@ class QUICKINFILL_OT_trim_edges(Operator):
             if removed_names:
                 names_str = ", ".join(f"'{n}'" for n in removed_names)
                 self.report({'WARNING'}, f"Trim Edges: {len(removed_names)} object(s) fully removed (mesh collapsed during trim): {names_str}")
+            if predicted_names:
+                names_str = ", ".join(f"'{n}'" for n in predicted_names)
+                self.report({'WARNING'}, f"Trim Edges: {len(predicted_names)} object(s) skipped, predicted to collapse entirely (left unchanged): {names_str}")
 
             obj_count = len(results)
             if obj_count == 1:
@@ -473,12 +674,73 @@ class QUICKINFILL_OT_trim_edges(Operator):
             return {'CANCELLED'}
 
 
+class QUICKINFILL_OT_make_lods(Operator):
+    bl_idname = "quick_infill.make_lods"
+    bl_label = "Make LODs"
+    bl_description = "Create decimated copies of selected mesh(es) at several face budgets from one progressive decimation pass"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    ratios: bpy.props.StringProperty(  # type: ignore
+        name="Face Ratios",
+        description="Comma-separated share of the original face count for each level, e.g. 1, 0.25, 0.05",
+        default="1.0, 0.25, 0.05",
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        try:
+            selected_objs = [obj for obj in bpy.context.selected_objects if obj.type == 'MESH']
+            if not selected_objs:
+                self.report({'ERROR'}, "No mesh selected.")
+                return {'CANCELLED'}
+            try:
+                ratios = [float(r) for r in self.ratios.replace(";", ",").split(",") if r.strip()]
+            except ValueError:
+                self.report({'ERROR'}, f"Invalid face ratios: '{self.ratios}'")
+                return {'CANCELLED'}
+            if not ratios or any(r <= 0.0 or r > 1.0 for r in ratios):
+                self.report({'ERROR'}, "Face ratios must be between 0 and 1.")
+                return {'CANCELLED'}
+
+            from .offset_utils import decimate_lod_chain
+            from .blender_meshlib_utils import blender_objects_to_meshlib
+            from concurrent.futures import ThreadPoolExecutor
+
+            # ── Phase 1: Export (Blender API, loads overlap in workers) ──
+            meshes = blender_objects_to_meshlib(selected_objs)
+
+            # ── Phase 2: One progressive decimation per object (parallel, pure meshlib) ──
+            def _chain(mesh):
+                faces = mesh.topology.numValidFaces()
+                return decimate_lod_chain(mesh, face_counts=[max(4, int(faces * r)) for r in ratios])
+
+            with ThreadPoolExecutor(max_workers=max(1, min(len(meshes), 4))) as executor:
+                chains = list(executor.map(_chain, meshes))
+
+            # ── Phase 3: Import levels back (Blender API, sequential) ──
+            created = []
+            for obj, lods in zip(selected_objs, chains):
+                for level, lod in enumerate(lods):
+                    created.append(meshlib_to_blender_via_stl(lod, f"{obj.name}_LOD{level}"))
+            select_results(created)
+
+            self.report({'INFO'}, f"Make LODs completed. Created {len(created)} objects ({len(ratios)} per mesh)")
+            return {'FINISHED'}
+
+        except Exception as e:
+            self.report({'ERROR'}, f"Make LODs failed: {e}")
+            return {'CANCELLED'}
+
+
 classes = (
     QUICKINFILL_OT_grow,
     QUICKINFILL_OT_shrink,
     QUICKINFILL_OT_remesh,
     QUICKINFILL_OT_trim_thin,
     QUICKINFILL_OT_trim_edges,
+    QUICKINFILL_OT_make_lods,
 )
 
 
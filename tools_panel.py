@@ -37,7 +37,7 @@ class QuickInfillToolsSettings(PropertyGroup):
 
     trim_edges_density: FloatProperty(
         name="Trim Edges Density",
-        description="Target face density before Trim Edges boolean (faces per area unit)",
+        description="Target face density before the Trim Edges boolean, used when the part is too large for the dense volume path (faces per area unit)",
         default=1.0,
         min=0.5,
         max=4.0,
@@ -56,6 +56,12 @@ class QuickInfillToolsSettings(PropertyGroup):
         default=False,
     )
     
+    split_components: bpy.props.BoolProperty(
+        name="Per Part",
+        description="Process separate parts of a mesh apart, each in its own tight grid and concurrently; parts close enough to interact stay together",
+        default=False,
+    )
+    
     show_tools: bpy.props.BoolProperty(
         name="Show Tools",
         description="Expand/collapse offset tools panel",
@@ -98,6 +104,8 @@ def draw_offset_tools(layout, context):
         row = tools_col.row(align=True)
         row.prop(settings, "auto_decimate", text="Auto Decimate")
         row.prop(settings, "replace_original", text="Replace Original")
+        row = tools_col.row(align=True)
+        row.prop(settings, "split_components", text="Per Part")
         
         tools_col.separator()
         
@@ -132,6 +140,12 @@ def draw_offset_tools(layout, context):
         row.prop(settings, "trim_edges_x", text="X")
         row.operator("quick_infill.trim_edges", text="Trim Edges", icon='MOD_BOOLEAN')
 
+        tools_col.separator()
+
+        # Decimated copies at several face budgets
+        row = tools_col.row(align=True)
+        row.operator("quick_infill.make_lods", text="Make LODs", icon='MOD_DECIM')
+
 
 classes = (
     QuickInfillToolsSettings,
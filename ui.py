@@ -30,6 +30,48 @@ class QuickInfillSettings(PropertyGroup):
         precision=3,
         update=reset_preset,
     )
+    auto_grow: BoolProperty(
+        name="Auto Grow",
+        description="Search for the smallest grow (up to Grow) that still seals every cavity, and use it",
+        default=False,
+        update=reset_preset,
+    )
+    skip_clean: BoolProperty(
+        name="Skip Clean Parts",
+        description="Run a quick coarse cavity check first and skip parts with no cavity above Min Cavity, or already healed with the same settings",
+        default=False,
+    )
+    min_cavity_volume: FloatProperty(
+        name="Min Cavity",
+        description="Cavities smaller than this volume (mm³) do not trigger a heal when Skip Clean Parts is on",
+        default=0.5,
+        min=0.0,
+        soft_max=100.0,
+        precision=2,
+    )
+    proxy_detail: BoolProperty(
+        name="Proxy Detail",
+        description="When the mesh is decimated to the vertex limit, heal the decimated proxy and then carry the original's full-resolution detail back onto every surface that follows it; only new infill surfaces keep the proxy's resolution (not used with Low Memory)",
+        default=False,
+    )
+    split_components: BoolProperty(
+        name="Per Part",
+        description="Heal separate parts of the mesh apart and concurrently, each in its own tight grid; parts within reach of each other's grow stay together (not used with Low Memory)",
+        default=False,
+    )
+    low_memory: BoolProperty(
+        name="Low Memory",
+        description="Free each stage's inputs as soon as they are consumed and spill intermediates to disk above the memory budget",
+        default=False,
+    )
+    memory_budget_gb: FloatProperty(
+        name="Memory Budget",
+        description="Process memory (GB) above which Low Memory mode spills intermediates to disk",
+        default=8.0,
+        min=0.5,
+        soft_max=64.0,
+        precision=1,
+    )
     shrink_mult: FloatProperty( 
         name="Shrink Multiplier",
         description="Multiplier for shrink distance",
@@ -221,6 +263,8 @@ class QUICKINFILL_PT_sidebar(Panel):
         # Create Cavity Infill button at top
         ifRow = col.row(align=True)
         ifRow.operator("quick_infill.heal_cavity", text="Create Cavity Infill")
+        col.operator("quick_infill.analyze_cavities", text="Analyze Cavities", icon='VIEWZOOM')
+        col.operator("quick_infill.heal_sweep", text="Parameter Sweep", icon='PRESET')
         
         col.separator(factor=1.0)
         
@@ -308,8 +352,17 @@ class QUICKINFILL_PT_sidebar(Panel):
                 prop_with_suffix(settings_col, settings, "resolution", "Resolution", "mm")
 
             prop_with_suffix(settings_col, settings, "grow", "Grow", "mm")
+            settings_col.prop(settings, "auto_grow")
             settings_col.prop(settings, "shrink_mult")
             settings_col.prop(settings, "trim_thin")
+            settings_col.prop(settings, "proxy_detail")
+            settings_col.prop(settings, "split_components")
+            settings_col.prop(settings, "skip_clean")
+            if getattr(settings, 'skip_clean', False):
+                prop_with_suffix(settings_col, settings, "min_cavity_volume", "Min Cavity", "mm³")
+            settings_col.prop(settings, "low_memory")
+            if getattr(settings, 'low_memory', False):
+                prop_with_suffix(settings_col, settings, "memory_budget_gb", "Budget", "GB")
         
         # Offset Tools section
         tools_panel.draw_offset_tools(col, context)
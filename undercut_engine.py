@@ -0,0 +1,392 @@
+"""
+Shared-grid undercut engine for Quick Infill.
+
+FixUndercuts fills every undercut by extending the solid down along -up to
+the lowest point of the part. Instead of letting MeshLib voxelize the source
+again for every direction, this engine samples the source once into a dense
+grid and computes each direction's fill as a (sheared) cumulative sweep over
+that grid, combining directions in place.
+"""
+
+from .meshlib_utils import get_meshlib
+from .volume_utils import (
+    MAX_DENSE_VOXELS,
+    dense_sdf_to_mesh,
+    dense_voxel_count,
+    mesh_to_dense_sdf,
+)
+
+# FixUndercuts.fix (bottomExtension 0) puts the base about four voxels below
+# the lowest point along up (measured at 4.1 for voxel sizes 0.1-0.5); the
+# shared-grid engine matches it so both give the same base.
+BOTTOM_EXTENSION_VOXELS = 4
+
+
+def bottom_extension_for(drop: float, voxel_size: float) -> float:
+    """
+    FixParams.bottomExtension that puts the base drop below the lowest point
+    plus the usual BOTTOM_EXTENSION_VOXELS.
+
+    A positive bottomExtension replaces FixUndercuts' own extension with
+    itself plus about two voxels.
+    """
+    return float(drop) + (BOTTOM_EXTENSION_VOXELS - 2) * float(voxel_size)
+
+
+def estimate_bytes(value) -> int:
+    """
+    Rough memory held by a cached value: numpy arrays, meshlib meshes and
+    level-set grids, and tuples, lists or __slots__ objects of them.
+    """
+    if value is None:
+        return 0
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_bytes(v) for v in value)
+    if hasattr(value, "heapBytes"):
+        return int(value.heapBytes())
+    if type(value).__name__ == "FloatGrid":
+        mm, _ = get_meshlib()
+        return int(mm.heapBytes(value))
+    slots = getattr(type(value), "__slots__", ())
+    if slots:
+        return sum(estimate_bytes(getattr(value, name, None)) for name in slots)
+    return 64
+
+
+class LRUCache:
+    """
+    Small thread-safe least-recently-used cache for in-session results.
+
+    Bounded by entry count and, with max_bytes, by the estimated memory of
+    its values; an entry larger than the whole budget is not stored.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int = None):
+        import threading
+        from collections import OrderedDict
+        self.max_entries = int(max_entries)
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        size = estimate_bytes(value) if self.max_bytes is not None else 0
+        with self._lock:
+            self._pop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._pop(next(iter(self._data)))
+
+    def _pop(self, key):
+        if key in self._data:
+            del self._data[key]
+            self._bytes -= self._sizes.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+
+# Source fields and per-direction fills from recent runs, so toggling
+# directions or the combine mode only sweeps the directions not seen yet.
+# Fills are bit-packed (one bit per voxel).
+_source_cache = LRUCache(4, max_bytes=512 * 1024 * 1024)
+_fill_cache = LRUCache(64, max_bytes=256 * 1024 * 1024)
+
+
+def clear_caches():
+    """Drop every cached source field and fill."""
+    _source_cache.clear()
+    _fill_cache.clear()
+
+
+def _vec_key(v, digits: int = 6):
+    return tuple(round(float(c), digits) for c in v)
+
+
+def _unit(v):
+    import numpy as np
+    a = np.array([float(v.x), float(v.y), float(v.z)], dtype=np.float64)
+    return a / np.linalg.norm(a)
+
+
+def _shift2d(a, d0: int, d1: int):
+    """Shift a 2D boolean array by whole cells, filling vacated cells with False."""
+    import numpy as np
+    if d0 == 0 and d1 == 0:
+        return a
+    out = np.zeros_like(a)
+    n0, n1 = a.shape
+    if abs(d0) >= n0 or abs(d1) >= n1:
+        return out
+    src0 = slice(max(0, -d0), n0 - max(0, d0))
+    dst0 = slice(max(0, d0), n0 - max(0, -d0))
+    src1 = slice(max(0, -d1), n1 - max(0, d1))
+    dst1 = slice(max(0, d1), n1 - max(0, -d1))
+    out[dst0, dst1] = a[src0, src1]
+    return out
+
+
+def directional_fill(solid, up, origin, voxel_size: float, bottom: float):
+    """
+    Sweep solid along -up down to the plane dot(p, up) = bottom.
+
+    The sweep runs layer by layer along the grid axis closest to up, shifting
+    the carried occupancy sideways by up's lateral slope, so tilted
+    directions cost the same as axis-aligned ones.
+
+    Args:
+        solid: boolean grid indexed [x, y, z]
+        up: unit numpy vector
+        origin: world position of voxel [0, 0, 0]
+
+    Returns:
+        boolean grid, solid plus everything below it along -up
+        (down to the bottom plane)
+    """
+    import numpy as np
+
+    vs = float(voxel_size)
+    k = int(np.argmax(np.abs(up)))
+    others = [a for a in range(3) if a != k]
+    arr = np.moveaxis(solid, k, 0)
+    flip = up[k] > 0
+    if flip:
+        arr = arr[::-1]
+    n = arr.shape[0]
+    step = [-up[o] / abs(up[k]) for o in others]
+
+    # Projection onto up of every voxel centre, split into a per-layer term
+    # and a fixed 2D term over the other two axes
+    coords = [origin[a] + np.arange(solid.shape[a]) * vs for a in range(3)]
+    layer_k = coords[k][::-1] if flip else coords[k]
+    base = coords[others[0]][:, None] * up[others[0]] + coords[others[1]][None, :] * up[others[1]]
+    cut = bottom - 0.5 * vs
+
+    out = np.empty(arr.shape, dtype=bool)
+    carry = np.zeros(arr.shape[1:], dtype=bool)
+    for i in range(n):
+        if i > 0:
+            d0 = int(round(i * step[0])) - int(round((i - 1) * step[0]))
+            d1 = int(round(i * step[1])) - int(round((i - 1) * step[1]))
+            carry = _shift2d(carry, d0, d1)
+        carry |= arr[i]
+        # Never remove existing solid, only limit the added fill
+        out[i] = arr[i] | (carry & (base + layer_k[i] * up[k] >= cut))
+
+    if flip:
+        out = out[::-1]
+    return np.ascontiguousarray(np.moveaxis(out, 0, k))
+
+
+def lowest_projection(occupancy, up, origin, voxel_size: float) -> float:
+    """Minimum of dot(p, up) over occupied voxel centres (inf if empty)."""
+    import numpy as np
+    vs = float(voxel_size)
+    ys = origin[1] + np.arange(occupancy.shape[1]) * vs
+    zs = origin[2] + np.arange(occupancy.shape[2]) * vs
+    plane = ys[:, None] * up[1] + zs[None, :] * up[2]
+    lowest = np.inf
+    # One x slice at a time keeps the temporary down to a 2D array
+    for i in range(occupancy.shape[0]):
+        sl = occupancy[i]
+        if sl.any():
+            lowest = min(lowest, float(plane[sl].min()) + (origin[0] + i * vs) * up[0])
+    return lowest
+
+
+def _box_blur(field):
+    """3-tap box blur along every axis (edges clamped)."""
+    import numpy as np
+    out = field
+    for axis in range(3):
+        padded = np.concatenate([np.take(out, [0], axis=axis), out, np.take(out, [-1], axis=axis)], axis=axis)
+        n = out.shape[axis]
+        lo = np.take(padded, range(0, n), axis=axis)
+        mid = np.take(padded, range(1, n + 1), axis=axis)
+        hi = np.take(padded, range(2, n + 2), axis=axis)
+        out = (lo + mid + hi) / 3.0
+    return out
+
+
+def shadow_box(lo, hi, up_vectors, bottoms):
+    """
+    Box around lo..hi and its shadows down every up vector's bottom plane.
+
+    Returns:
+        tuple: (min corner, max corner) as numpy vectors
+    """
+    import numpy as np
+    corners = np.array([[x, y, z] for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+    extent = [corners]
+    for up, bottom in zip(up_vectors, bottoms):
+        # Each corner dropped along -up onto the bottom plane
+        extent.append(corners - np.outer(corners @ up - bottom, up))
+    extent = np.vstack(extent)
+    return extent.min(axis=0), extent.max(axis=0)
+
+
+def swept_floor_points(ground_points, up_vectors, bottoms, z_up):
+    """
+    Lowest points along z_up of ground_points dropped onto each bottom plane.
+
+    The union-mode Z pass runs on the combined result, so its floor is as
+    low as the tilted fills reach, not the model's own lowest point.
+
+    Returns:
+        numpy array, one point per up vector
+    """
+    import numpy as np
+    out = []
+    for up, bottom in zip(up_vectors, bottoms):
+        drop = ground_points @ up - bottom
+        i = int(np.argmin(ground_points @ z_up - drop * float(up @ z_up)))
+        out.append(ground_points[i] - drop[i] * up)
+    return np.array(out).reshape(-1, 3)
+
+
+def shared_grid_layout(mesh, up_vectors, voxel_size: float, floors=None):
+    """
+    Grid covering the mesh and its shadows down every up vector's bottom plane.
+
+    Bottom planes sit below floors, the lowest projection to fill down to
+    along each up vector (the mesh's own lowest point by default).
+
+    Returns:
+        tuple: (origin, dims, bottoms per up vector)
+    """
+    import numpy as np
+    from .meshlib_utils import get_mrmeshnumpy
+    mn = get_mrmeshnumpy()
+
+    vs = float(voxel_size)
+    pts = np.asarray(mn.toNumpyArray(mesh.points), dtype=np.float64)
+    if floors is None:
+        floors = [float((pts @ up).min()) for up in up_vectors]
+    bottoms = [float(f) - BOTTOM_EXTENSION_VOXELS * vs for f in floors]
+    lo, hi = shadow_box(pts.min(axis=0), pts.max(axis=0), up_vectors, bottoms)
+    # Room for a further bottom extension below everything (union-mode Z
+    # post-process runs on the combined result) plus a margin for the surface
+    pad = (BOTTOM_EXTENSION_VOXELS + 2.0) * vs
+    origin = tuple(float(v) for v in lo - pad)
+    top = hi + pad
+    dims = tuple(max(1, int((top[a] - origin[a]) / vs) + 1) for a in range(3))
+    return origin, dims, bottoms
+
+
+def fix_undercuts_shared_grid(mesh, up_vectors, voxel_size: float, use_union_combine: bool,
+                              z_after_up=None, max_voxels: int = MAX_DENSE_VOXELS,
+                              layout_ups=None, mesh_hash=None, ground_points=None):
+    """
+    Multi-direction undercut fill from one shared voxelization of mesh.
+
+    Directions are combined in place: intersection (positive angle) or
+    union (negative angle). z_after_up, if given, is swept once more over
+    the combined result, like the union-mode Z post-process.
+
+    With mesh_hash, the source field and every direction's fill are cached
+    for later runs on the same geometry. layout_ups should then list every
+    direction the caller might ask for (a superset of up_vectors), so the
+    grid, and with it the cache, stays the same when directions change.
+
+    ground_points (numpy array) sets the floor every fill reaches down to,
+    e.g. the whole model's points when mesh is one part of it.
+
+    Returns:
+        tuple: (mesh, total undercuts) or None when the dense grid would
+        exceed max_voxels (callers fall back to per-direction FixUndercuts)
+    """
+    import numpy as np
+    mm, _ = get_meshlib()
+
+    ups = [_unit(u) for u in up_vectors]
+    all_ups = ups + ([_unit(z_after_up)] if z_after_up is not None else [])
+    grid_ups = all_ups + [_unit(u) for u in (layout_ups or [])]
+    vs = float(voxel_size)
+    floors = None
+    if ground_points is not None:
+        floors = [float((ground_points @ u).min()) for u in grid_ups]
+        if z_after_up is not None:
+            # The Z pass runs on the combined fills, which reach below the model
+            k = len(ups)
+            bottoms = [f - BOTTOM_EXTENSION_VOXELS * vs for f in floors[:k]]
+            swept = swept_floor_points(ground_points, ups, bottoms, all_ups[k])
+            floors[k] = min(floors[k], float((swept @ all_ups[k]).min()))
+    origin, dims, bottoms = shared_grid_layout(mesh, grid_ups, vs, floors)
+    if dense_voxel_count(dims) > max_voxels:
+        return None
+
+    grid_key = None if mesh_hash is None else (mesh_hash, round(vs, 6), _vec_key(origin), tuple(dims))
+
+    def _count_undercuts(u):
+        # Per-face normal tests, no voxelization involved
+        params = mm.FixUndercuts.FindParams()
+        params.upDirection = u
+        undercuts = mm.FaceBitSet()
+        mm.FixUndercuts.find(mesh, params, undercuts)
+        return undercuts.count()
+
+    src_sdf = _source_cache.get(grid_key) if grid_key else None
+    if src_sdf is None:
+        src_sdf = mesh_to_dense_sdf(mesh, origin, dims, vs, max_dist=2.0 * vs)
+        if grid_key:
+            _source_cache.put(grid_key, src_sdf)
+    solid = src_sdf < 0.0
+
+    total_undercuts = 0
+    acc = None
+    for u, up, bottom in zip(up_vectors, ups, bottoms):
+        fill_key = grid_key + (_vec_key(up),) if grid_key else None
+        cached = _fill_cache.get(fill_key) if fill_key else None
+        if cached is not None:
+            packed, count = cached
+            fill = np.unpackbits(packed, count=solid.size).view(bool).reshape(solid.shape)
+        else:
+            fill = directional_fill(solid, up, origin, vs, bottom)
+            count = _count_undercuts(u)
+            if fill_key:
+                _fill_cache.put(fill_key, (np.packbits(fill), count))
+        total_undercuts += count
+        if acc is None:
+            acc = fill
+        elif use_union_combine:
+            np.logical_or(acc, fill, out=acc)
+        else:
+            np.logical_and(acc, fill, out=acc)
+        del fill
+    if z_after_up is not None:
+        # Like FixUndercuts on the merged mesh: extend below the merged
+        # result's own lowest point, not the source's
+        z_up = all_ups[-1]
+        lowest = lowest_projection(acc, z_up, origin, vs)
+        if floors is not None:
+            lowest = min(lowest, floors[len(ups)])
+        bottom = lowest - BOTTOM_EXTENSION_VOXELS * vs
+        acc = directional_fill(acc, z_up, origin, vs, bottom)
+        total_undercuts += _count_undercuts(z_after_up)
+
+    # The source surface is re-extracted from its own field (so at voxel
+    # resolution, not its original triangles); only the added material comes
+    # from the occupancy grid, softened by a small blur so it is not staircased
+    extra = (acc & ~solid).astype(np.float32)
+    del acc, solid
+    field = np.minimum(src_sdf, (0.5 - _box_blur(extra)) * (2.0 * vs))
+    return dense_sdf_to_mesh(field, origin, vs), total_undercuts
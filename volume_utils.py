@@ -0,0 +1,449 @@
+"""
+Dense voxel-volume utilities for Quick Infill.
+
+Helpers for sampling meshes into small dense signed-distance grids, working on
+them with numpy, and extracting surfaces back out. Used by analysis passes that
+need cheap whole-volume answers (cavities, inscribed distance, ...) rather than
+a full-resolution offset.
+"""
+
+from typing import Optional
+
+# Dense grids above this many voxels are refused; callers fall back to the
+# sparse offset path instead of allocating gigabytes of float32.
+MAX_DENSE_VOXELS = 64_000_000
+
+# Voxel budget of the inscribed-distance pre-pass; it has to stay cheap next
+# to the full-resolution offset it is trying to avoid.
+INSCRIBED_MAX_VOXELS = 64_000
+
+
+def dense_grid_for_box(box, voxel_size: float, pad: float = 0.0):
+    """
+    Compute origin and dimensions of a dense grid covering box expanded by pad.
+
+    Returns:
+        tuple: (origin (x, y, z), dims (nx, ny, nz))
+    """
+    vs = float(voxel_size)
+    lo = (box.min.x - pad, box.min.y - pad, box.min.z - pad)
+    hi = (box.max.x + pad, box.max.y + pad, box.max.z + pad)
+    dims = tuple(max(1, int((hi[i] - lo[i]) / vs) + 1) for i in range(3))
+    return lo, dims
+
+
+def dense_voxel_count(dims) -> int:
+    return int(dims[0]) * int(dims[1]) * int(dims[2])
+
+
+def mesh_to_dense_sdf(mesh, origin, dims, voxel_size: float, max_dist: Optional[float] = None,
+                      signed: bool = True):
+    """
+    Sample the signed distance to mesh on a dense grid (negative inside).
+
+    Args:
+        origin: (x, y, z) of the grid's minimum corner
+        dims: (nx, ny, nz) voxel counts
+        max_dist: distances beyond this are only approximated (faster)
+        signed: False skips the winding-number sign and returns unsigned
+            distances (much cheaper when the caller knows the sign already)
+
+    Returns:
+        float32 numpy array indexed [x, y, z]
+    """
+    from .meshlib_utils import get_meshlib, get_mrmeshnumpy
+    mm, mc = get_meshlib()
+    mn = get_mrmeshnumpy()
+    import numpy as np
+
+    vs = float(voxel_size)
+    p = mm.MeshToDistanceVolumeParams()
+    p.vol.voxelSize = mm.Vector3f(vs, vs, vs)
+    p.vol.origin = mm.Vector3f(*origin)
+    p.vol.dimensions = mm.Vector3i(*dims)
+    if signed:
+        p.dist.signMode = mm.SignDetectionMode.WindingRule
+        p.fwn = mc.FastWindingNumber(mesh)
+    else:
+        p.dist.signMode = mm.SignDetectionMode.Unsigned
+    if max_dist is not None:
+        p.dist.maxDistSq = float(max_dist) ** 2
+        p.dist.nullOutsideMinMax = False
+    volume = mm.meshToDistanceVolume(mm.MeshPart(mesh), p)
+    return np.asarray(mn.getNumpy3Darray(volume), dtype=np.float32)
+
+
+def estimate_surface_faces(field, iso: float = 0.0) -> int:
+    """
+    Face count marching cubes would produce for the iso surface of field.
+
+    Every grid edge crossing the surface gives one vertex and a closed
+    triangle mesh has about two faces per vertex.
+    """
+    inside = field <= iso
+    crossings = 0
+    for axis in range(3):
+        lo = [slice(None)] * 3
+        hi = [slice(None)] * 3
+        lo[axis] = slice(None, -1)
+        hi[axis] = slice(1, None)
+        crossings += int((inside[tuple(lo)] != inside[tuple(hi)]).sum())
+    return 2 * crossings
+
+
+def dense_sdf_to_mesh(field, origin, voxel_size: float, iso: float = 0.0, target_faces: Optional[int] = None,
+                      max_error: Optional[float] = None, max_slab_faces: int = 1_000_000, max_workers: int = 4):
+    """
+    Extract the iso surface of a dense field (negative inside) with marching cubes.
+
+    With target_faces, a surface that would come out denser is extracted
+    in slabs along x instead. Each slab is decimated to its share of the
+    budget as soon as it is extracted, with its cut boundary locked, so the
+    full-density surface never exists at once. The slabs are then welded and
+    a last pass brings the seams down to the target. max_error (default one
+    voxel) bounds the deviation of that decimation.
+    """
+    from .meshlib_utils import get_meshlib, get_mrmeshnumpy
+    mm, _ = get_meshlib()
+    mn = get_mrmeshnumpy()
+    import numpy as np
+
+    vs = float(voxel_size)
+    if target_faces is not None:
+        estimate = estimate_surface_faces(field, iso)
+        if estimate > int(target_faces):
+            return _slab_sdf_to_mesh(field, origin, vs, iso, int(target_faces), estimate,
+                                     vs if max_error is None else float(max_error), max_slab_faces, max_workers)
+
+    # Only the direct path needs a float64 copy of the whole field; slabs
+    # each copy just their own slice
+    volume = mn.simpleVolumeFrom3Darray(np.ascontiguousarray(field, dtype=np.float64))
+    volume.voxelSize = mm.Vector3f(vs, vs, vs)
+
+    params = mm.MarchingCubesParams()
+    params.origin = mm.Vector3f(*origin)
+    params.iso = float(iso)
+    params.lessInside = True
+    return mm.marchingCubes(volume, params)
+
+
+def _slab_sdf_to_mesh(field, origin, vs: float, iso: float, target_faces: int, estimate: int,
+                      max_error: float, max_slab_faces: int, max_workers: int):
+    from .meshlib_utils import get_meshlib
+    from .offset_utils import decimation_parts
+    from concurrent.futures import ThreadPoolExecutor
+    import numpy as np
+    mm, _ = get_meshlib()
+
+    nx = field.shape[0]
+    n_slabs = max(decimation_parts(estimate), -(-estimate // max_slab_faces))
+    n_slabs = max(1, min(n_slabs, (nx - 1) // 4))
+    # Neighbouring slabs share one layer of samples, so their cut
+    # boundaries get identical vertices
+    cuts = np.linspace(0, nx - 1, n_slabs + 1).astype(int)
+    ratio = float(target_faces) / float(estimate)
+
+    def _slab(bounds):
+        a, b = bounds
+        slab_origin = (origin[0] + a * vs, origin[1], origin[2])
+        part = dense_sdf_to_mesh(field[a:b + 1], slab_origin, vs, iso)
+        faces = part.topology.numValidFaces()
+        if faces == 0:
+            return part
+        settings = mm.DecimateSettings()
+        settings.maxDeletedFaces = max(0, faces - int(faces * ratio))
+        settings.maxError = max_error
+        settings.packMesh = True
+        settings.touchNearBdEdges = False
+        mm.decimateMesh(part, settings)
+        return part
+
+    with ThreadPoolExecutor(max_workers=max(1, min(n_slabs, max_workers))) as executor:
+        parts = list(executor.map(_slab, zip(cuts[:-1], cuts[1:])))
+
+    mesh = mm.Mesh()
+    for part in parts:
+        mesh.addMesh(part)
+    del parts
+    mm.uniteCloseVertices(mesh, 0.01 * vs, True)
+
+    # Seam pass: the locked cut boundaries are decimated like the rest
+    faces = mesh.topology.numValidFaces()
+    if faces > target_faces:
+        settings = mm.DecimateSettings()
+        settings.maxDeletedFaces = faces - target_faces
+        settings.maxError = max_error
+        settings.packMesh = True
+        mm.decimateMesh(mesh, settings)
+    return mesh
+
+
+def redistance_sdf(field, origin, voxel_size: float, level: float, max_dist: float):
+    """
+    Signed distance field of the solid {field <= level}.
+
+    For an exact signed distance field this is the solid dilated (level > 0)
+    or eroded (level < 0) by |level|. Its surface is extracted from field
+    directly and a fresh distance pass makes the result exact again, so
+    offsets can be chained. The marching cubes output is decimated to a
+    quarter voxel first, which cuts the distance pass time by roughly 3x
+    without moving the result, and the sign is taken from field itself, so
+    the pass only needs unsigned distances.
+
+    Returns:
+        float32 field (negative inside), or None if the solid is empty
+    """
+    from .meshlib_utils import get_mrmeshpy
+    mm = get_mrmeshpy()
+
+    surface = dense_sdf_to_mesh(field, origin, voxel_size, iso=level)
+    if surface.topology.numValidFaces() == 0:
+        return None
+    from .offset_utils import apply_decimation_parts
+    settings = mm.DecimateSettings()
+    settings.maxError = 0.25 * float(voxel_size)
+    settings.packMesh = True
+    apply_decimation_parts(settings, surface.topology.numValidFaces())
+    mm.decimateMesh(surface, settings)
+    import numpy as np
+    dist = mesh_to_dense_sdf(surface, origin, field.shape, voxel_size, max_dist=max_dist, signed=False)
+    np.abs(dist, out=dist)
+    dist[field <= level] *= -1.0
+    return dist
+
+
+def closing_sdf(src_sdf, origin, voxel_size: float, distance: float):
+    """
+    Morphological closing of the solid described by src_sdf, by distance.
+
+    The dilated surface is extracted straight from src_sdf (no re-voxelizing
+    the source); only the erosion needs a fresh distance pass.
+    Returns a field that is negative inside the closed solid.
+    """
+    dilated_sdf = redistance_sdf(src_sdf, origin, voxel_size, distance, max_dist=2.0 * distance)
+    if dilated_sdf is None:
+        return src_sdf.copy()
+    dilated_sdf += float(distance)
+    return dilated_sdf
+
+
+def trim_edges_grid(mesh, voxel_size: float, distance: float):
+    """Return (origin, dims) of the dense grid trim_edges_volume samples mesh on."""
+    vs = float(voxel_size)
+    return dense_grid_for_box(mesh.computeBoundingBox(), vs, pad=2.0 * float(distance) + 3.0 * vs)
+
+
+def trim_edges_volume(mesh, voxel_size: float, distance: float, trim_x: float,
+                      max_voxels: int = MAX_DENSE_VOXELS, target_faces: Optional[int] = None):
+    """
+    Trim Edges as one dense distance-field pipeline.
+
+    Source field f0, then +2d, -3d, +(1 + trim_x)d on exact re-distanced
+    fields, then max with f0 to intersect with the source, and a single
+    surface extraction at the end. Nothing is voxelized twice and no
+    intermediate mesh leaves this function. target_faces is passed on to
+    dense_sdf_to_mesh.
+
+    Returns:
+        meshlib mesh (empty if the shape collapses at -3d), or None when the
+        dense grid would exceed max_voxels
+    """
+    from .meshlib_utils import get_mrmeshpy
+    mm = get_mrmeshpy()
+
+    vs = float(voxel_size)
+    d = float(distance)
+    grow = (1.0 + float(trim_x)) * d
+    margin = 2.0 * vs
+    origin, dims = trim_edges_grid(mesh, vs, d)
+    if dense_voxel_count(dims) > max_voxels:
+        return None
+
+    src_sdf = mesh_to_dense_sdf(mesh, origin, dims, vs, max_dist=2.0 * d + margin)
+    dilated = redistance_sdf(src_sdf, origin, vs, 2.0 * d, max_dist=3.0 * d + margin)
+    eroded = redistance_sdf(dilated, origin, vs, -3.0 * d, max_dist=grow + margin) if dilated is not None else None
+    del dilated
+    if eroded is None:
+        return mm.Mesh()
+    eroded -= grow
+    import numpy as np
+    np.maximum(eroded, src_sdf, out=eroded)
+    del src_sdf
+    return dense_sdf_to_mesh(eroded, origin, vs, target_faces=target_faces)
+
+
+def inscribed_depth(mesh, voxel_size: float, dilate: float = 0.0,
+                    max_voxels: int = INSCRIBED_MAX_VOXELS):
+    """
+    Coarse estimate of the maximum inscribed distance of mesh.
+
+    This is the largest shrink the solid survives. The signed distance is
+    sampled on a grid of a quarter voxel_size, or coarser if that would
+    exceed max_voxels, and the deepest interior sample is the estimate. With
+    dilate > 0 the estimate is for the solid grown by dilate first, as in
+    the closing before Trim Edges' erosion.
+
+    Returns:
+        tuple: (depth, error); the true distance lies within error of depth
+    """
+    import math
+
+    box = mesh.computeBoundingBox()
+    pad = float(dilate)
+    size = box.max - box.min
+    volume = (size.x + 2.0 * pad) * (size.y + 2.0 * pad) * (size.z + 2.0 * pad)
+    vs = max(0.25 * float(voxel_size), (max(volume, 0.0) / max_voxels) ** (1.0 / 3.0), 1e-6)
+    origin, dims = dense_grid_for_box(box, vs, pad=pad + vs)
+    while dense_voxel_count(dims) > max_voxels:
+        vs *= 1.1
+        origin, dims = dense_grid_for_box(box, vs, pad=pad + vs)
+
+    # Any point lies within half a voxel diagonal of a sample, and distance
+    # fields change no faster than distance itself
+    error = 0.5 * math.sqrt(3.0) * vs
+    field = mesh_to_dense_sdf(mesh, origin, dims, vs)
+    if pad > 0.0:
+        # No point is deeper than half the smallest extent of the grown box
+        reach = 0.5 * min(size.x, size.y, size.z) + pad + vs
+        field = redistance_sdf(field, origin, vs, pad, max_dist=reach)
+        # The grown surface is itself only resolved to about a voxel
+        error += vs
+    depth = 0.0 if field is None else max(0.0, -float(field.min()))
+    return depth, error
+
+
+def open_thin_regions(mesh, thin_points, voxel_size: float, max_voxels: int = MAX_DENSE_VOXELS):
+    """
+    Morphological opening by voxel_size, applied only around thin_points.
+
+    Trim Thin's shrink-and-regrow, limited to one dense grid over the padded
+    box of the thin points. Only the removed material is meshed: every
+    removed component that contains a thin point is grown slightly past the
+    source surface and subtracted from mesh, so the rest of the surface
+    keeps its original triangles.
+
+    Returns:
+        meshlib mesh (empty if nothing survives), or None when the grid would
+        exceed max_voxels
+    """
+    import numpy as np
+    from .meshlib_utils import get_mrmeshpy
+    mm = get_mrmeshpy()
+
+    vs = float(voxel_size)
+    r = vs
+    margin = 2.0 * vs
+    pts = np.asarray(thin_points, dtype=np.float64).reshape(-1, 3)
+    if len(pts) == 0:
+        return mm.copyMesh(mesh)
+
+    # Removal is kept to the inner box; the outer band gives the erosion
+    # and regrow the source they depend on
+    inner_lo = pts.min(axis=0) - (r + margin)
+    inner_hi = pts.max(axis=0) + (r + margin)
+    outer = mm.Box3f(mm.Vector3f(*inner_lo), mm.Vector3f(*inner_hi))
+    origin, dims = dense_grid_for_box(outer, vs, pad=2.0 * r + margin)
+    if dense_voxel_count(dims) > max_voxels:
+        return None
+
+    src_sdf = mesh_to_dense_sdf(mesh, origin, dims, vs, max_dist=2.0 * r + margin)
+    eroded = redistance_sdf(src_sdf, origin, vs, -r, max_dist=r + margin)
+    opened = redistance_sdf(eroded, origin, vs, r, max_dist=margin) if eroded is not None else None
+    del eroded
+
+    if opened is None:
+        # Nothing survives the erosion: the opening removes everything here
+        opened = np.full(src_sdf.shape, margin, dtype=np.float32)
+
+    # Material the opening removes: inside the source, outside the opened solid
+    coords = [origin[a] + np.arange(dims[a]) * vs for a in range(3)]
+    inside = [(c >= inner_lo[a]) & (c <= inner_hi[a]) for a, c in enumerate(coords)]
+    removed_mask = (src_sdf < 0.0) & (opened > 0.0)
+    removed_mask &= inside[0][:, None, None] & inside[1][None, :, None] & inside[2][None, None, :]
+
+    labels, count = label_components(removed_mask)
+    del removed_mask
+    if count == 0:
+        return mm.copyMesh(mesh)
+    # Thin points sit on the surface, possibly in the voxel just outside it
+    idx = np.rint((pts - np.asarray(origin)) / vs).astype(np.int64)
+    near = np.array([(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)])
+    idx = np.clip((idx[:, None, :] + near[None, :, :]).reshape(-1, 3), 0, np.asarray(dims) - 1)
+    keep = np.unique(labels[idx[:, 0], idx[:, 1], idx[:, 2]])
+    keep = keep[keep > 0]
+    if len(keep) == 0:
+        return mm.copyMesh(mesh)
+    kept = np.isin(labels, keep)
+    del labels
+
+    # Grow the kept material outward past the source surface, so the cutter's
+    # boundary never coincides with the surface it is subtracted from. Its
+    # distance to the kept voxels (in dilation steps) bounds the sideways
+    # spread, so the cutter only follows the opened solid where it meets
+    # the kept material
+    reach = 0.5 * margin + vs
+    dist = np.where(kept, 0.0, np.inf).astype(np.float32)
+    for step in range(1, int(np.ceil(reach / vs)) + 2):
+        grown = kept.copy()
+        for axis in range(3):
+            lo = [slice(None)] * 3
+            hi = [slice(None)] * 3
+            lo[axis] = slice(None, -1)
+            hi[axis] = slice(1, None)
+            grown[tuple(hi)] |= kept[tuple(lo)]
+            grown[tuple(lo)] |= kept[tuple(hi)]
+        dist[grown & ~kept] = step * vs
+        kept = grown
+    removed = np.maximum(np.maximum(src_sdf - 0.5 * margin, -opened), np.minimum(dist - reach, vs))
+    del src_sdf, opened, kept, dist
+
+    cutter = dense_sdf_to_mesh(removed, origin, vs)
+    if cutter.topology.numValidFaces() == 0:
+        return mm.copyMesh(mesh)
+    res = mm.boolean(mesh, cutter, mm.BooleanOperation.DifferenceAB)
+    if not res.valid():
+        return None
+    return res.mesh
+
+
+def label_components(mask):
+    """
+    Label 6-connected components of a boolean 3D mask.
+
+    Returns:
+        tuple: (labels int32 array with 0 = background, component count)
+    """
+    import numpy as np
+
+    n = mask.size
+    if not mask.any():
+        return np.zeros(mask.shape, dtype=np.int32), 0
+
+    background = np.int64(n)
+    flat_mask = mask.ravel()
+    lab = np.where(mask, np.arange(n, dtype=np.int64).reshape(mask.shape), background)
+
+    # Min-label propagation with pointer jumping: each voxel's label is the
+    # index of a voxel in the same component with an equal or smaller label.
+    while True:
+        new = lab.copy()
+        for axis in range(3):
+            lo = [slice(None)] * 3
+            hi = [slice(None)] * 3
+            lo[axis] = slice(None, -1)
+            hi[axis] = slice(1, None)
+            lo, hi = tuple(lo), tuple(hi)
+            np.minimum(new[hi], lab[lo], out=new[hi])
+            np.minimum(new[lo], lab[hi], out=new[lo])
+        new[~mask] = background
+        flat = new.ravel()
+        inside = flat_mask
+        flat[inside] = flat[flat[inside]]
+        if np.array_equal(new, lab):
+            break
+        lab = new
+
+    _, inverse = np.unique(lab.ravel()[flat_mask], return_inverse=True)
+    labels = np.zeros(n, dtype=np.int32)
+    labels[flat_mask] = inverse.astype(np.int32) + 1
+    return labels.reshape(mask.shape), int(inverse.max()) + 1